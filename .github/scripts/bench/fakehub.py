@@ -0,0 +1,247 @@
+"""
+A local stand-in for the slice of the GitHub API release-notes.py talks to.
+
+    hub = FakeHub(prs)          # {number: REST-shaped PR}; latency= to add a round trip
+    hub.start()
+    os.environ["GITHUB_API_URL"] = hub.url
+    ...
+    hub.requests, hub.bytes_in, hub.bytes_out
+    hub.stop()
+
+Serves `/pulls` (state, sort, pagination with `Link` headers), `/pulls/{n}`
+(with ETags and 304s), issue labels and comments, and GraphQL `pullRequest`
+lookups by alias. Every response carries `X-RateLimit-*` headers counting down
+from `rate_limit`; a 304 doesn't count, as on GitHub. Counts requests and
+bytes each way so a benchmark can report what a run cost.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+PULL_RE = re.compile(r"^/repos/[^/]+/[^/]+/pulls/(\d+)$")
+PULLS_RE = re.compile(r"^/repos/[^/]+/[^/]+/pulls$")
+LABELS_RE = re.compile(r"^/repos/[^/]+/[^/]+/issues/(\d+)/labels(?:/(.+))?$")
+COMMENTS_RE = re.compile(r"^/repos/[^/]+/[^/]+/issues/(\d+)/comments$")
+COMMENT_RE = re.compile(r"^/repos/[^/]+/[^/]+/issues/comments/(\d+)$")
+LOOKUP_RE = re.compile(r"(\w+): pullRequest\(number: (\d+)\) \{ \.\.\.(\w+) \}")
+
+
+def make_pr(number: int, body: str, labels: List[str], merged: bool = True) -> Dict:
+    """A PR shaped like the REST API's, padded with the nested objects a real
+    one carries, so payload sizes are realistic."""
+    stamp = "2025-01-01T00:00:00Z"
+    repo = {
+        "id": 1, "name": "bench", "full_name": "bench/bench",
+        "owner": {"login": "bench", "id": 1, "type": "Organization"},
+        "description": "x" * 200, "html_url": "https://github.com/bench/bench",
+    }
+    return {
+        "number": number,
+        "title": f"Change number {number} to the runtime",
+        "body": body,
+        "state": "closed" if merged else "open",
+        "html_url": f"https://github.com/bench/bench/pull/{number}",
+        "merged_at": stamp if merged else None,
+        "updated_at": stamp,
+        "user": {"login": f"contributor-{number % 17}", "id": number % 17, "type": "User"},
+        "labels": [{"id": i, "name": name, "color": "ededed"} for i, name in enumerate(labels)],
+        "head": {"ref": f"branch-{number}", "sha": "0" * 40, "repo": repo},
+        "base": {"ref": "main", "sha": "0" * 40, "repo": repo},
+        "_links": {k: {"href": f"https://api.github.com/{k}/{number}"} for k in
+                   ("self", "html", "issue", "comments", "commits", "statuses")},
+    }
+
+
+class FakeHub:
+    def __init__(self, prs: Dict[int, Dict], rate_limit: int = 5000, latency: float = 0.0):
+        self.prs = prs
+        # Seconds each response is held back, standing in for the round trip
+        # to GitHub that localhost doesn't have.
+        self.latency = latency
+        self.comments: Dict[int, List[Dict]] = {}
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset_at = int(time.time()) + 3600
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.by_route: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self) -> "FakeHub":
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, the
+            # body waits out the client's delayed ACK — 40 ms a request that
+            # GitHub doesn't charge.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                hub._handle(self, "GET")
+
+            def do_POST(self):
+                hub._handle(self, "POST")
+
+            def do_PUT(self):
+                hub._handle(self, "PUT")
+
+            def do_PATCH(self):
+                hub._handle(self, "PATCH")
+
+            def do_DELETE(self):
+                hub._handle(self, "DELETE")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    # ── dispatch ─────────────────────────────────────────────────────────────
+
+    def _handle(self, req: BaseHTTPRequestHandler, method: str) -> None:
+        length = int(req.headers.get("Content-Length") or 0)
+        raw = req.rfile.read(length) if length else b""
+        payload = json.loads(raw) if raw else None
+        url = urlparse(req.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        route, status, body, headers = self._route(method, url.path, query, payload, req.headers)
+        if self.latency:
+            time.sleep(self.latency)
+        data = b"" if body is None else json.dumps(body).encode()
+
+        with self.lock:
+            self.requests += 1
+            self.by_route[route] = self.by_route.get(route, 0) + 1
+            self.bytes_in += len(raw) + len(req.requestline) + len(str(req.headers))
+            if status != 304:
+                self.remaining = max(self.remaining - 1, 0)
+            remaining = self.remaining
+
+        req.send_response(status)
+        for name, value in headers.items():
+            req.send_header(name, value)
+        req.send_header("Content-Type", "application/json")
+        req.send_header("Content-Length", str(len(data)))
+        req.send_header("X-RateLimit-Limit", str(self.rate_limit))
+        req.send_header("X-RateLimit-Remaining", str(remaining))
+        req.send_header("X-RateLimit-Reset", str(self.reset_at))
+        req.end_headers()
+        req.wfile.write(data)
+        with self.lock:
+            self.bytes_out += len(data)
+
+    def _route(self, method, path, query, payload, headers):
+        if method == "POST" and path.endswith("/graphql"):
+            return ("graphql",) + self._graphql(payload)
+
+        match = PULL_RE.match(path)
+        if match and method == "GET":
+            pr = self.prs.get(int(match.group(1)))
+            if pr is None:
+                return "pull", 404, {"message": "Not Found"}, {}
+            etag = f'"{pr["number"]}-{pr["updated_at"]}"'
+            if headers.get("If-None-Match") == etag:
+                return "pull", 304, None, {"ETag": etag}
+            return "pull", 200, pr, {"ETag": etag}
+
+        if PULLS_RE.match(path) and method == "GET":
+            return ("pulls",) + self._pulls(path, query)
+
+        match = LABELS_RE.match(path)
+        if match:
+            pr = self.prs.get(int(match.group(1)))
+            if pr is None:
+                return "labels", 404, {"message": "Not Found"}, {}
+            names = [lbl["name"] for lbl in pr["labels"]]
+            if method == "PUT":
+                names = list(payload.get("labels", []))
+            elif method == "POST":
+                names += [n for n in payload.get("labels", []) if n not in names]
+            elif method == "DELETE" and match.group(2):
+                name = unquote(match.group(2))
+                if name not in names:
+                    return "labels", 404, {"message": "Label does not exist"}, {}
+                names.remove(name)
+            pr["labels"] = [{"name": name} for name in names]
+            return "labels", 200, pr["labels"], {}
+
+        match = COMMENTS_RE.match(path)
+        if match:
+            comments = self.comments.setdefault(int(match.group(1)), [])
+            if method == "POST":
+                with self.lock:
+                    comment = {"id": sum(map(len, self.comments.values())) + 1, "body": payload["body"]}
+                comments.append(comment)
+                return "comments", 201, comment, {}
+            page, per_page = int(query.get("page", 1)), int(query.get("per_page", 30))
+            return "comments", 200, comments[(page - 1) * per_page:page * per_page], {}
+
+        match = COMMENT_RE.match(path)
+        if match and method == "PATCH":
+            for comments in self.comments.values():
+                for comment in comments:
+                    if comment["id"] == int(match.group(1)):
+                        comment["body"] = payload["body"]
+                        return "comment", 200, comment, {}
+            return "comment", 404, {"message": "Not Found"}, {}
+
+        return "unknown", 404, {"message": f"No route for {method} {path}"}, {}
+
+    def _pulls(self, path, query):
+        state = query.get("state", "open")
+        prs = [
+            pr for pr in self.prs.values()
+            if state == "all" or (pr["state"] == "open") == (state == "open")
+        ]
+        key = "updated_at" if query.get("sort") == "updated" else "number"
+        prs.sort(key=lambda pr: pr[key], reverse=query.get("direction", "desc") == "desc")
+        page, per_page = int(query.get("page", 1)), min(int(query.get("per_page", 30)), 100)
+        last = max((len(prs) + per_page - 1) // per_page, 1)
+        links = []
+        if page < last:
+            links.append(f'<{self.url}{path}?page={page + 1}>; rel="next"')
+        links.append(f'<{self.url}{path}?page={last}>; rel="last"')
+        return 200, prs[(page - 1) * per_page:page * per_page], {"Link": ", ".join(links)}
+
+    def _graphql(self, payload):
+        data: Dict[str, Optional[Dict]] = {}
+        errors = []
+        for alias, number, fragment in LOOKUP_RE.findall(payload["query"]):
+            pr = self.prs.get(int(number))
+            if pr is None:
+                data[alias] = None
+                errors.append({"type": "NOT_FOUND", "path": ["repository", alias],
+                               "message": f"Could not resolve to a PullRequest with the number of {number}."})
+            elif fragment == "stamp":
+                data[alias] = {"number": pr["number"], "updatedAt": pr["updated_at"]}
+            else:
+                data[alias] = {
+                    "number": pr["number"], "title": pr["title"], "body": pr["body"],
+                    "url": pr["html_url"], "mergedAt": pr["merged_at"],
+                    "updatedAt": pr["updated_at"], "author": {"login": pr["user"]["login"]},
+                    "labels": {"nodes": [{"name": lbl["name"]} for lbl in pr["labels"]]},
+                }
+        body = {"data": {"repository": data}}
+        if errors:
+            body["errors"] = errors
+        return 200, body, {}
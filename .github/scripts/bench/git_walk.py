@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the git range walk behind `aggregate` on a synthetic history.
+
+    python .github/scripts/bench/git_walk.py               # 100k commits, every 2nd a PR
+    python .github/scripts/bench/git_walk.py --commits 500000 --pr-every 10
+
+Compares the streaming `-z` walker against the previous implementation —
+`subprocess.run(capture_output=True)` on the whole log, then two regexes
+compiled per line — on the same repo. Reports wall time and the Python heap
+peak of each, and checks both find the same PRs.
+
+Most of the wall time is git's own: it parses every commit object in the
+range whichever way its output is read, so the two are within noise of each
+other. The walker also yields each merge's SHA and commit time, which the old
+one did not. Its heap holds one record per PR found, where the old one held
+the whole log: at 100k commits, best of 5 on one core,
+
+    PR every   buffered            streaming
+    2          1081 ms  17.1 MiB   1143 ms  13.2 MiB
+    10         1132 ms  13.2 MiB   1088 ms   3.0 MiB
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from harness import load_release_notes, make_repo
+
+
+def buffered_walk(from_ref: str, to_ref: str):
+    """The walk as it was: whole output in memory, patterns per line."""
+    out = subprocess.run(
+        ["git", "log", "--format=%s", f"{from_ref}..{to_ref}"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    numbers, seen = [], set()
+    for subject in out.splitlines():
+        match = re.search(r"\(#(\d+)\)\s*$", subject) or re.match(
+            r"^Merge pull request #(\d+)\b", subject
+        )
+        if match:
+            number = int(match.group(1))
+            if number not in seen:
+                seen.add(number)
+                numbers.append(number)
+    numbers.reverse()
+    return numbers
+
+
+def measure(label: str, fn, runs: int):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} {best * 1000:9.1f} ms   heap peak {peak / 1024 / 1024:7.1f} MiB")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--commits", type=int, default=100_000)
+    parser.add_argument("--pr-every", type=int, default=2, help="One commit in this many merges a PR")
+    parser.add_argument("--runs", type=int, default=3, help="Best of this many timed runs")
+    args = parser.parse_args()
+
+    rn = load_release_notes()
+    with tempfile.TemporaryDirectory() as repo:
+        start = time.perf_counter()
+        expected = make_repo(repo, args.commits, pr_every=args.pr_every)
+        print(f"{args.commits} commits, {len(expected)} PRs "
+              f"(built in {time.perf_counter() - start:.1f}s)")
+
+        os.chdir(repo)
+        notes = rn.ReleaseNotes("bench/bench")
+        buffered = measure("buffered", lambda: buffered_walk("start", "main"), args.runs)
+        streamed = measure(
+            "streaming", lambda: notes.merges_in_range("start", "main"), args.runs
+        )
+
+    numbers = [m.number for m in streamed]
+    if numbers != buffered or numbers != expected:
+        print("MISMATCH: the walkers disagree about the PRs in range")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+"""
+Shared pieces of the release-notes benchmarks: loading the script under test
+and building synthetic git histories to run it against.
+
+Nothing here touches the network or the checkout the benchmark runs from.
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "release-notes.py")
+
+
+def load_release_notes():
+    """Import release-notes.py, whose hyphen keeps it out of `import`."""
+    spec = importlib.util.spec_from_file_location("release_notes", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_repo(
+    path: str,
+    commits: int,
+    pr_every: int = 2,
+    merge_share: int = 3,
+    tags: Optional[Dict[str, int]] = None,
+) -> List[int]:
+    """Build a linear history of `commits` empty commits in `path`.
+
+    Every `pr_every`-th commit merges a PR, in the two subject forms
+    `pr_numbers_in_range` recognises: one in `merge_share` is a merge-commit
+    subject, the rest squash subjects. The others are noise, some of it shaped
+    like a PR reference that must not match. `tags` maps a tag name to the
+    commit index (1-based) it points at; tag `start` always marks the root.
+
+    Written through `git fast-import`, so 100k commits take seconds. Returns
+    the PR numbers in merge order.
+    """
+    subprocess.run(["git", "init", "-q", "-b", "main", path], check=True)
+    numbers: List[int] = []
+    stamp = int(time.time()) - commits
+    with tempfile.TemporaryFile() as stream:
+        for i in range(1, commits + 1):
+            if i % pr_every == 0:
+                number = len(numbers) + 1
+                numbers.append(number)
+                if number % merge_share == 0:
+                    subject = f"Merge pull request #{number} from contributor/branch-{number}"
+                else:
+                    subject = f"Change number {number} to the runtime (#{number})"
+            elif i % 7 == 0:
+                subject = f"Follow up on card #{i} and issue (#{i}) discussion"
+            else:
+                subject = f"chore: housekeeping commit {i}"
+            message = f"{subject}\n\nBody mentioning (#{i}) which must be ignored.\n".encode()
+            stream.write(
+                f"commit refs/heads/main\nmark :{i}\n"
+                f"committer Bench <bench@example.com> {stamp + i} +0000\n"
+                f"data {len(message)}\n".encode()
+                + message
+                + b"\n"
+            )
+        for tag, index in {"start": 1, **(tags or {})}.items():
+            stream.write(f"reset refs/tags/{tag}\nfrom :{index}\n\n".encode())
+        stream.seek(0)
+        subprocess.run(
+            ["git", "fast-import", "--quiet"], cwd=path, stdin=stream, check=True
+        )
+    subprocess.run(["git", "checkout", "-q", "main"], cwd=path, check=True)
+    return numbers
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process, in KiB.
+
+    VmHWM where /proc has it: `ru_maxrss` is carried over from the parent
+    across fork and exec, so a child started by a benchmark holding a large
+    fixture would report the benchmark's peak, not its own.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+# Runs the script as __main__ and, on the way out, leaves its peak RSS where
+# the benchmark can read it.
+_PROBE = """
+import atexit, runpy, sys
+sys.path.insert(0, {bench!r})
+from harness import peak_rss_kb
+def report():
+    with open({out!r}, "w") as f:
+        f.write(str(peak_rss_kb()))
+atexit.register(report)
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def run_script(args: List[str], cwd: str, env: Dict[str, str]) -> Dict:
+    """Run release-notes.py with `args` in a fresh process.
+
+    Returns its wall time, exit code, combined output and peak RSS in MiB.
+    """
+    with tempfile.NamedTemporaryFile("r", suffix=".rss") as rss:
+        probe = _PROBE.format(bench=os.path.dirname(os.path.abspath(__file__)), out=rss.name)
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", probe, SCRIPT, *args],
+            cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        )
+        wall = time.perf_counter() - start
+        peak = rss.read().strip()
+    return {
+        "wall": wall,
+        "code": proc.returncode,
+        "rss_mib": int(peak) / 1024 if peak else 0.0,
+        "output": proc.stdout.decode("utf-8", "replace"),
+    }
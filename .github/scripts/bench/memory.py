@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark what `aggregate` holds in memory, at 10k PRs by default.
+
+    python .github/scripts/bench/memory.py
+    python .github/scripts/bench/memory.py --prs 20000 --body-kib 8
+
+Builds a history merging `--prs` PRs, each with a description of about
+`--body-kib` KiB and a release-note block, serves them from a `FakeHub`, and
+runs `aggregate` over the range by both routes — batched GraphQL with a token,
+paging `/pulls` without — in a fresh process each. Reports peak RSS, and that
+less the peak of `--help`, which is the interpreter and the script itself: the
+rest is what the run keeps of the PRs.
+
+A run that keeps whole payloads until the fetch is done grows with the
+descriptions; one that keeps a compact record per PR, parsed as its page
+arrives, grows with the PR count alone. Raising `--body-kib` tells them apart.
+"""
+
+import argparse
+import os
+import tempfile
+
+from fakehub import FakeHub, make_pr
+from harness import make_repo, run_script
+
+
+def long_body(number: int, kib: int) -> str:
+    """A long description — context, a pasted log — ending in a note."""
+    filler = f"Context for change {number}, and a line of the log it fixed.\n"
+    return (
+        filler * (kib * 1024 // len(filler))
+        + f"```release-note\nCapsules can now declare limit number {number}.\n```\n"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--prs", type=int, default=10000, help="PRs in the range")
+    parser.add_argument("--body-kib", type=int, default=4, help="Size of each PR description")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        repo = os.path.join(workdir, "repo")
+        numbers = make_repo(repo, args.prs * 2, pr_every=2)
+        labels = ["type/feature", "type/bug", "type/docs"]
+        hub = FakeHub({
+            n: make_pr(n, long_body(n, args.body_kib), [labels[n % 3], "release-note"])
+            for n in numbers
+        }).start()
+
+        base = {k: v for k, v in os.environ.items() if not k.startswith("GITHUB_")}
+        aggregate = ["--repo", "bench/bench", "aggregate", "start", "main", "--no-cache",
+                     "--file", os.devnull]
+        try:
+            idle = run_script(["--help"], repo, base)["rss_mib"]
+            print(f"{args.prs} PRs, {args.body_kib} KiB descriptions; --help peaks at {idle:.1f} MiB\n")
+            print(f"{'route':<10} {'wall s':>8} {'RSS MiB':>9} {'over idle':>10} {'KiB/PR':>7}")
+            for route, env in (
+                ("graphql", dict(base, GITHUB_API_URL=hub.url, GITHUB_TOKEN="bench")),
+                ("rest", dict(base, GITHUB_API_URL=hub.url)),
+            ):
+                result = run_script(aggregate, repo, env)
+                if result["code"] != 0:
+                    print(result["output"])
+                    raise SystemExit(f"{route} exited {result['code']}")
+                held = result["rss_mib"] - idle
+                print(f"{route:<10} {result['wall']:>8.2f} {result['rss_mib']:>9.1f} "
+                      f"{held:>10.1f} {held * 1024 / args.prs:>7.2f}")
+        finally:
+            hub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark `aggregate --range` across several repositories.
+
+    python .github/scripts/bench/multi_repo.py
+    python .github/scripts/bench/multi_repo.py --sizes 200,400,800,1600 --latency 0.1
+
+Builds one clone per size, each merging that many PRs, and a `FakeHub` that
+holds every response back `--latency` seconds, as the round trip to GitHub
+would. Runs `aggregate` once per repository, the way a multi-repo release was
+put together before, then once with a `--range` for each. The fan-out run
+should take about as long as the slowest single run, not the sum of them.
+
+Keys are shared across repositories (see `pipeline.note_body`), so the
+combined changelog also has fewer entries than the single runs put together.
+"""
+
+import argparse
+import os
+import re
+import tempfile
+
+from fakehub import FakeHub, make_pr
+from harness import make_repo, run_script
+from pipeline import note_body
+
+
+def run(args, cwd, env):
+    result = run_script(args, cwd, env)
+    if result["code"] != 0:
+        print(result["output"])
+        raise SystemExit(f"aggregate exited {result['code']}")
+    entries = re.search(r"(\d+) changelog entries", result["output"])
+    return result["wall"], int(entries.group(1)) if entries else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="300,600,1200", help="PRs merged in each repository")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per API response")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        labels = ["type/feature", "type/bug", "type/docs"]
+        hub = FakeHub(
+            {n: make_pr(n, note_body(n), [labels[n % 3]]) for n in range(1, max(sizes) + 1)},
+            latency=args.latency,
+        ).start()
+        env = {k: v for k, v in os.environ.items() if not k.startswith("GITHUB_")}
+        env.update(GITHUB_API_URL=hub.url, GITHUB_TOKEN="bench")
+        common = ["--no-cache", "--file", os.devnull]
+        try:
+            repos = []
+            for i, size in enumerate(sizes):
+                path = os.path.join(workdir, f"repo-{i}")
+                make_repo(path, size * 2, pr_every=2)
+                repos.append((f"bench/repo-{i}", path, size))
+
+            print(f"{'run':<28} {'PRs':>6} {'wall s':>8} {'entries':>8}")
+            walls, total = [], 0
+            for repo, path, size in repos:
+                wall, entries = run(["--repo", repo, "aggregate", "start", "main", *common], path, env)
+                walls.append(wall)
+                total += entries
+                print(f"{repo:<28} {size:>6} {wall:>8.2f} {entries:>8}")
+            print(f"{'one after another':<28} {sum(sizes):>6} {sum(walls):>8.2f} {total:>8}")
+
+            ranges = [arg for repo, path, _ in repos for arg in ("--range", f"{repo}={path}:start..main")]
+            wall, entries = run(["aggregate", *ranges, *common], workdir, env)
+            print(f"{'--range, all at once':<28} {sum(sizes):>6} {wall:>8.2f} {entries:>8}")
+            print(f"\nslowest single run {max(walls):.2f} s; fan-out is {wall / max(walls):.2f}x that")
+        finally:
+            hub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the release-note scanner on pathological PR bodies.
+
+    python .github/scripts/bench/note_scan.py
+    python .github/scripts/bench/note_scan.py --sizes 1000,4000,16000
+
+Compares `scan_release_notes` against the previous implementation — one lazy
+regex searched over the whole body — on bodies built to hurt it:
+
+- inline: N mentions of ```release-note on one long line, as a bot comment or
+  minified paste might carry. Each failed match rescans to the end of the
+  line, so the regex is quadratic in N.
+- log: a CRLF build log of N lines pasted under a fence that never closes.
+- blocks: N closed blocks; the regex only ever saw the first.
+
+Doubling N should roughly double the scanner's time: the scan is one forward
+pass, and stops at `NOTE_SCAN_CHARS` characters however large the body is.
+"""
+
+import argparse
+import re
+import time
+
+from harness import load_release_notes
+
+RELEASE_NOTE_RE = re.compile(r"```release-note(?P<attrs>[^\n]*)\n(?P<body>[\s\S]*?)```")
+
+
+def regex_scan(body: str):
+    """The parse as it was: the first match only, over the whole body."""
+    return RELEASE_NOTE_RE.search(body)
+
+
+def inline(n: int) -> str:
+    return "Use a ```release-note block. " * n
+
+
+def log(n: int) -> str:
+    lines = (f"2026-01-01T00:00:{i % 60:02d}Z worker-{i % 8} step {i} ok" for i in range(n))
+    return "```release-note\r\nAdded a thing\r\n\r\nBuild log:\r\n" + "\r\n".join(lines)
+
+
+def blocks(n: int) -> str:
+    return "".join(
+        f"```release-note key=change-{i}\nChanged thing {i} in some way\n```\n\n" for i in range(n)
+    )
+
+
+def best_ms(fn, body: str, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(body)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="1000,2000,4000,8000",
+                        help="Comma-separated N for every case")
+    parser.add_argument("--runs", type=int, default=3, help="Best of this many timed runs")
+    args = parser.parse_args()
+
+    rn = load_release_notes()
+    print(f"scan limit {rn.NOTE_SCAN_CHARS} characters\n")
+    print(f"{'case':<8} {'N':>7} {'body KiB':>9} {'regex ms':>10} {'scanner ms':>11} {'blocks':>7}")
+    for name, build in (("inline", inline), ("log", log), ("blocks", blocks)):
+        for n in (int(size) for size in args.sizes.split(",")):
+            body = build(n)
+            old = best_ms(regex_scan, body, args.runs)
+            new = best_ms(rn.scan_release_notes, body, args.runs)
+            found = len(rn.scan_release_notes(body))
+            print(f"{name:<8} {n:>7} {len(body) / 1024:>9.0f} {old:>10.2f} {new:>11.2f} {found:>7}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark `aggregate` and `validate` end to end, offline.
+
+    python .github/scripts/bench/pipeline.py                   # 100, 1k and 10k PRs
+    python .github/scripts/bench/pipeline.py --sizes 100,500
+
+For each size it builds a synthetic history merging that many PRs and a
+`FakeHub` serving them, then runs the script as CI does — a fresh process,
+pointed at the stand-in through GITHUB_API_URL — and reports wall time,
+requests made, bytes each way and the process's peak RSS:
+
+    aggregate/graphql   with a token, batched GraphQL lookups
+    aggregate/rest      without one, paging /pulls
+    aggregate/record    with a token, saving a cassette
+    aggregate/replay    that cassette, with no token and another API host;
+                        fails unless its notes match the recorded run's
+    validate/event      one PR, read from an event payload
+    validate/sweep      --all-open over that many open PRs, a third mislabelled
+
+Re-run it before and after any change to fetching or parsing; the numbers are
+the regression baseline. Nothing here needs the network.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from typing import Dict, List
+
+from fakehub import FakeHub, make_pr
+from harness import make_repo, run_script
+
+
+def note_body(number: int) -> str:
+    """A PR description shaped like the real ones: prose, a checklist, and a
+    release-note block — sometimes NONE, sometimes keyed."""
+    if number % 5 == 0:
+        note = "NONE"
+    else:
+        note = f"Capsules can now declare limit number {number} under capabilities.resources."
+    key = f" key=group-{number // 4}" if number % 4 == 0 else ""
+    return (
+        f"## Summary\n\nReworks part {number} of the runtime.\n\n"
+        + "Some context about the change. " * 20
+        + "\n\n## Checklist\n\n- [x] tests\n- [x] docs\n\n"
+        + f"```release-note{key}\n{note}\n```\n"
+    )
+
+
+def measure(name: str, size: int, hub: FakeHub, args: List[str], cwd: str, env: Dict, ok_codes=(0,)) -> Dict:
+    before = (hub.requests, hub.bytes_in, hub.bytes_out)
+    result = run_script(["--repo", "bench/bench", *args], cwd, env)
+    if result["code"] not in ok_codes:
+        print(result["output"])
+        raise SystemExit(f"{name} at {size} PRs exited {result['code']}")
+    row = {
+        "scenario": name,
+        "prs": size,
+        "wall_s": round(result["wall"], 3),
+        "requests": hub.requests - before[0],
+        "bytes_in": hub.bytes_in - before[1],
+        "bytes_out": hub.bytes_out - before[2],
+        "peak_rss_mib": round(result["rss_mib"], 1),
+    }
+    print(
+        f"{row['scenario']:<18} {size:>6} {row['wall_s']:>9.3f} {row['requests']:>9} "
+        f"{row['bytes_out'] / 1024:>11.1f} {row['bytes_in'] / 1024:>10.1f} {row['peak_rss_mib']:>9.1f}"
+    )
+    return row
+
+
+def bench_size(size: int, workdir: str) -> List[Dict]:
+    repo = os.path.join(workdir, f"repo-{size}")
+    numbers = make_repo(repo, size * 2, pr_every=2)
+    labels = ["type/feature", "type/bug", "type/docs"]
+
+    merged = FakeHub({
+        n: make_pr(n, note_body(n), [labels[n % 3], "release-note"]) for n in numbers
+    }).start()
+    # Open PRs: every third carries the wrong release-note* label.
+    open_prs = FakeHub({
+        n: make_pr(
+            n, note_body(n),
+            [labels[n % 3], "release-note/invalid" if n % 3 == 0 else
+             ("release-note/none" if n % 5 == 0 else "release-note")],
+            merged=False,
+        )
+        for n in range(1, size + 1)
+    }).start()
+
+    base = {k: v for k, v in os.environ.items() if not k.startswith("GITHUB_")}
+    rows = []
+    try:
+        env = dict(base, GITHUB_API_URL=merged.url, GITHUB_TOKEN="bench")
+        aggregate = ["aggregate", "start", "main", "--no-cache", "--file", os.devnull]
+        rows.append(measure("aggregate/graphql", size, merged, aggregate, repo, env))
+        env = dict(base, GITHUB_API_URL=merged.url)
+        rows.append(measure("aggregate/rest", size, merged, aggregate, repo, env))
+
+        # The replay has to take the recorded GraphQL route without a token
+        # telling it to, and match requests whatever host they name.
+        cassette = os.path.join(workdir, f"cassette-{size}.jsonl")
+        recorded, replayed = (os.path.join(workdir, f"{run}-{size}.md") for run in ("recorded", "replayed"))
+        env = dict(base, GITHUB_API_URL=merged.url, GITHUB_TOKEN="bench")
+        rows.append(measure(
+            "aggregate/record", size, merged,
+            ["aggregate", "start", "main", "--record", cassette, "--file", recorded], repo, env,
+        ))
+        env = dict(base, GITHUB_API_URL="http://127.0.0.1:9")
+        rows.append(measure(
+            "aggregate/replay", size, merged,
+            ["aggregate", "start", "main", "--replay", cassette, "--file", replayed], repo, env,
+        ))
+        with open(recorded) as a, open(replayed) as b:
+            if a.read() != b.read():
+                raise SystemExit(f"aggregate/replay at {size} PRs wrote other notes than the recording")
+
+        event = os.path.join(workdir, "event.json")
+        with open(event, "w") as f:
+            json.dump({"action": "synchronize", "pull_request": open_prs.prs[3]}, f)
+        env = dict(base, GITHUB_API_URL=open_prs.url, GITHUB_TOKEN="bench", GITHUB_EVENT_PATH=event)
+        rows.append(measure(
+            "validate/event", size, open_prs, ["validate", "--pr", "3", "--no-cache"], repo, env,
+            ok_codes=(0, 1),
+        ))
+        env = dict(base, GITHUB_API_URL=open_prs.url, GITHUB_TOKEN="bench")
+        rows.append(measure(
+            "validate/sweep", size, open_prs, ["validate", "--all-open", "--no-cache"], repo, env
+        ))
+    finally:
+        merged.stop()
+        open_prs.stop()
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated PR counts")
+    parser.add_argument("--json", help="Also write the rows here, for comparing runs")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<18} {'PRs':>6} {'wall s':>9} {'requests':>9} "
+          f"{'KiB down':>11} {'KiB up':>10} {'RSS MiB':>9}")
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (int(s) for s in args.sizes.split(",")):
+            rows.extend(bench_size(size, workdir))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark `serve`: webhook deliveries in, labels out, against a `FakeHub`.
+
+    python .github/scripts/bench/serve.py
+    python .github/scripts/bench/serve.py --prs 50 --edits 8 --debounce 0.3
+
+Starts the daemon in a fresh process, then sends every PR a burst of signed
+`edited` deliveries — the description saved `--edits` times, `--gap` seconds
+apart, ending on the wording that should stick. It waits for the queue to
+drain and reports, from the daemon's `/stats`: deliveries received, the
+validations they collapsed into, API requests made, and the latency from a
+PR's last delivery to its label being written. Then it checks each PR carries
+the label its final description earns, and that an unsigned delivery is
+turned away.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from fakehub import FakeHub, make_pr
+from harness import SCRIPT
+
+SECRET = b"bench-secret"
+
+
+def body_for(number: int, edit: int, last: bool) -> str:
+    """Drafts along the way are missing the block or leave it unclosed; the
+    last save is valid for even PRs and NONE for odd ones."""
+    if not last:
+        return f"Draft {edit} of #{number}.\n\n```release-note\nWork in progress"
+    note = f"Capsules can now declare limit number {number}." if number % 2 == 0 else "NONE"
+    return f"Final description of #{number}.\n\n```release-note\n{note}\n```\n"
+
+
+def deliver(url: str, payload: dict, secret: bytes = SECRET) -> int:
+    data = json.dumps(payload).encode()
+    signature = "sha256=" + hmac.new(secret, data, hashlib.sha256).hexdigest()
+    req = urllib.request.Request(url, data=data, method="POST", headers={
+        "Content-Type": "application/json",
+        "X-GitHub-Event": "pull_request",
+        "X-Hub-Signature-256": signature,
+    })
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def stats(url: str) -> dict:
+    with urllib.request.urlopen(url + "stats") as resp:
+        return json.load(resp)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--prs", type=int, default=20, help="PRs edited at once")
+    parser.add_argument("--edits", type=int, default=5, help="Saves per PR")
+    parser.add_argument("--gap", type=float, default=0.05, help="Seconds between saves")
+    parser.add_argument("--debounce", type=float, default=0.5, help="Passed to serve")
+    parser.add_argument("--workers", type=int, default=4, help="Passed to serve")
+    args = parser.parse_args()
+
+    hub = FakeHub({n: make_pr(n, "", [], merged=False) for n in range(1, args.prs + 1)}).start()
+    env = {k: v for k, v in os.environ.items() if not k.startswith("GITHUB_")}
+    env.update(GITHUB_API_URL=hub.url, GITHUB_TOKEN="bench", GITHUB_WEBHOOK_SECRET=SECRET.decode())
+    daemon = subprocess.Popen(
+        [sys.executable, SCRIPT, "--repo", "bench/bench", "serve", "--port", "0",
+         "--debounce", str(args.debounce), "--workers", str(args.workers)],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    try:
+        match = re.search(r"Listening on (\S+)", daemon.stdout.readline())
+        if not match:
+            raise SystemExit("serve did not start")
+        url = match.group(1)
+
+        start = time.perf_counter()
+        for edit in range(args.edits):
+            for number in range(1, args.prs + 1):
+                pr = dict(hub.prs[number], body=body_for(number, edit, edit == args.edits - 1))
+                payload = {"action": "edited", "pull_request": pr,
+                           "repository": {"full_name": "bench/bench"}}
+                status = deliver(url, payload)
+                if status != 202:
+                    raise SystemExit(f"delivery for #{number} answered {status}")
+            time.sleep(args.gap)
+        while True:
+            current = stats(url)
+            if not current["pending"] and not current["running"]:
+                break
+            time.sleep(0.02)
+        wall = time.perf_counter() - start
+
+        unsigned = deliver(url, {"action": "edited"}, secret=b"wrong")
+        current = stats(url)
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        hub.stop()
+
+    wrong = [
+        n for n, pr in hub.prs.items()
+        if [lbl["name"] for lbl in pr["labels"]] != ["release-note" if n % 2 == 0 else "release-note/none"]
+    ]
+    latency = current.get("latency_ms", {})
+    print(f"{'deliveries':<22} {current['received']}")
+    print(f"{'validations':<22} {current['processed'] + current['failed']} "
+          f"({current['coalesced']} coalesced, {current['failed']} failed)")
+    print(f"{'API requests':<22} {hub.requests}")
+    print(f"{'latency p50/p95/max':<22} {latency.get('p50')}/{latency.get('p95')}/{latency.get('max')} ms "
+          f"(debounce {args.debounce * 1000:.0f} ms)")
+    print(f"{'wall':<22} {wall:.2f} s")
+    print(f"{'unsigned delivery':<22} {unsigned}")
+    print(f"{'wrong labels':<22} {len(wrong)}{' ' + str(wrong[:10]) if wrong else ''}")
+    return 1 if wrong or unsigned != 401 else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
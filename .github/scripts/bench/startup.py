@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark the startup of `release-notes.py` — what every PR event pays.
+
+    python .github/scripts/bench/startup.py
+    python .github/scripts/bench/startup.py --runs 50
+
+Times fresh processes: the bare interpreter, `--help`, and a `validate` that
+reads its PR from an event payload and writes nothing, so it does all of the
+check's own work without a network. Reports the median and best wall time of
+each, then the slowest imports of the `validate` run by `-X importtime`.
+
+The difference between `python -c pass` and `validate` is the script's own
+cost. With `requests` gone its imports are mostly `http.client` and the `ssl`
+it loads; the rest is compiling the script, which a fresh CI checkout pays
+however the code is laid out, since it has no bytecode cache to reuse.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import SCRIPT
+
+EVENT = {
+    "action": "opened",
+    "pull_request": {
+        "number": 42,
+        "title": "Add a thing",
+        "body": "Adds a thing.\n\n```release-note\nCapsules can now declare a thing.\n```\n",
+        "html_url": "https://github.com/bench/bench/pull/42",
+        "user": {"login": "bench"},
+        "labels": [],
+    },
+}
+
+
+def wall(cmd, runs: int):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, capture_output=True, check=False)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), min(times)
+
+
+def slowest_imports(cmd, top: int):
+    """(cumulative µs, module) of the slowest top-level imports under `cmd`."""
+    err = subprocess.run(
+        [cmd[0], "-X", "importtime", *cmd[1:]], capture_output=True, text=True
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Top-level imports only: nested ones are indented, and already
+        # counted in their parent's time.
+        if not name.startswith("  "):
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=20, help="Processes per command")
+    parser.add_argument("--top", type=int, default=10, help="Imports to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        event = os.path.join(tmp, "event.json")
+        with open(event, "w") as f:
+            json.dump(EVENT, f)
+        validate = [
+            sys.executable, SCRIPT, "--repo", "bench/bench", "validate", "--pr", "42",
+            "--no-labels", "--no-cache", "--event", event,
+        ]
+        commands = [
+            ("python -c pass", [sys.executable, "-c", "pass"]),
+            ("--help", [sys.executable, SCRIPT, "--help"]),
+            ("validate (event)", validate),
+        ]
+        print(f"{'command':<18} {'median ms':>10} {'best ms':>9}")
+        for label, cmd in commands:
+            median, best = wall(cmd, args.runs)
+            print(f"{label:<18} {median:>10.1f} {best:>9.1f}")
+
+        print(f"\nslowest imports of validate (cumulative ms)")
+        for cumulative, name in slowest_imports(validate, args.top):
+            print(f"  {cumulative / 1000:>7.1f}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -15,7 +15,9 @@ blocks the aggregator then ignored.
 exits non-zero so the check fails.
 
 `aggregate` runs once per release tag: it reads the block from every PR merged
-in the range and renders CHANGELOG/vX.Y.Z.md.
+in the range and renders CHANGELOG/vX.Y.Z.md. Where `validate --record-note`
+left the parsed block on the merge commit as a git note, it reads that instead
+of the PR.
 
 The block lives in the PR description. For a card-tracked PR barkfactory writes
 it from the card; the board itself is gitignored, so the PR body is the only
@@ -36,31 +38,60 @@ An optional `key=` groups several PRs onto one changelog line — see
 import re
 import json
 import argparse
+import fnmatch
+import hashlib
+import http.client
+import math
 import os
+import random
 import sys
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+import threading
+import time
+import urllib.parse
+import zlib
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Iterable, Iterator, List, Dict, NamedTuple, Optional, Tuple
 import subprocess
 
-try:
-    import requests
-except ImportError:
-    print("Error: requests library not found. Install with: pip install requests")
-    sys.exit(1)
+# Standard library only. What only some paths need — sqlite3, tomllib,
+# datetime, the thread and process pools — is imported where it is used:
+# `validate` runs on every PR event, and its startup is most of its work.
 
 
-# The fence line carries optional `key=value` attributes; everything up to the
-# closing fence is the note. Kept as one expression used by both subcommands so
-# the two can't disagree about what a block is.
-RELEASE_NOTE_RE = re.compile(
-    r"```release-note(?P<attrs>[^\n]*)\n(?P<body>[\s\S]*?)```"
-)
+# A block opens with this fence; the rest of its line carries optional
+# `key=value` attributes, and everything up to the next ``` is the note. One
+# scanner, used by both subcommands, so the two can't disagree about what a
+# block is.
+NOTE_FENCE = "```release-note"
+ATTR_RE = re.compile(r"\b(?P<name>[A-Za-z][\w-]*)=(?P<value>\S*)")
 KEY_RE = re.compile(r"\bkey=(?P<key>[A-Za-z0-9][A-Za-z0-9._-]*)")
 VALID_KEY_RE = re.compile(r"^[a-z0-9][a-z0-9-]*$")
 
+# Subject lines only, in the two forms a merge actually produces: squash
+# ("Some title (#12)") and merge commit ("Merge pull request #12 from ...").
+# Both are anchored, because an unanchored "#(\d+)" over full commit messages
+# matches card ids, issue references and anything else shaped like one.
+SQUASH_SUBJECT_RE = re.compile(r"\(#(\d+)\)\s*$")
+MERGE_SUBJECT_RE = re.compile(r"^Merge pull request #(\d+)\b")
+
 PLACEHOLDERS = ["<your release note", "todo", "...", "[description]"]
 MIN_NOTE_LENGTH = 10
 
+# Opens the one comment the check keeps on a PR; the digest of the block it
+# was written for follows.
+STICKY_MARKER = "<!-- release-note-check"
+
+# How much of a PR body is scanned for blocks, in characters of the decoded
+# text rather than bytes of UTF-8. GitHub caps a body at 65536 characters;
+# pasted logs in an API-created PR or an event payload can be far larger, and
+# nothing past the description proper is a note.
+NOTE_SCAN_CHARS = 256 * 1024
+
+# Which changelog section each note is filed under: .github/release-notes.toml.
+DEFAULT_RULES = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "release-notes.toml")
+)
+
 LABELS = {
     "valid": "release-note",
     "none": "release-note/none",
@@ -68,34 +99,1675 @@ LABELS = {
 }
 
 
-def parse_release_note(body: str) -> Optional[Dict[str, Optional[str]]]:
-    """Extract the release-note block from a PR body.
+class NoteBlock(NamedTuple):
+    """One ```release-note``` block, where it sits in the body and what it says.
+
+    `line` and `end_line` are 1-based, of the opening and closing fences;
+    `start` and `end` are offsets into the body with line endings normalized.
+    An unclosed block runs to the end of what was scanned.
+    """
+
+    key: Optional[str]
+    attrs: Dict[str, str]
+    text: str
+    line: int
+    end_line: int
+    start: int
+    end: int
+    closed: bool
+
+
+def scan_release_notes(body: str, limit: int = NOTE_SCAN_CHARS) -> List[NoteBlock]:
+    """Every release-note block in the first `limit` characters of `body`.
+
+    One forward pass: each search starts where the last one stopped, so an
+    unclosed fence or a thousand stray ones cost one read of the body rather
+    than one per fence.
+    """
+    body = (body or "")[:limit]
+    if "\r" in body:
+        body = body.replace("\r\n", "\n").replace("\r", "\n")
+
+    blocks = []
+    pos, line, counted = 0, 1, 0
+    while True:
+        start = body.find(NOTE_FENCE, pos)
+        if start < 0:
+            break
+        after = start + len(NOTE_FENCE)
+        # "```release-notes" or "```release-note-draft" is some other fence.
+        if after < len(body) and not body[after].isspace():
+            pos = after
+            continue
+
+        eol = body.find("\n", after)
+        if eol < 0:
+            eol = len(body)
+        attrs = body[after:eol]
+        close = body.find("```", eol)
+        closed = close >= 0
+        end = close + 3 if closed else len(body)
+
+        line += body.count("\n", counted, start)
+        end_line = line + body.count("\n", start, close if closed else end)
+        counted = start
+        key_match = KEY_RE.search(attrs)
+        blocks.append(
+            NoteBlock(
+                key=key_match.group("key") if key_match else None,
+                attrs={m.group("name"): m.group("value") for m in ATTR_RE.finditer(attrs)},
+                # Newlines are collapsed: a note wrapped across lines in the PR
+                # textarea is still one sentence, and a changelog bullet is one
+                # line.
+                text=" ".join(body[eol:close if closed else end].split()),
+                line=line,
+                end_line=end_line,
+                start=start,
+                end=end,
+                closed=closed,
+            )
+        )
+        pos = end
+    return blocks
+
+
+def parse_release_notes(body: str) -> List[Dict[str, Optional[str]]]:
+    """The closed release-note blocks of a PR body, as `{key, text}` in order.
+
+    Empty when there is no block at all — distinct from a block holding NONE,
+    which is a deliberate "no user-facing change" and a valid answer.
+    """
+    return [{"key": b.key, "text": b.text} for b in scan_release_notes(body) if b.closed]
+
+
+class ReleaseNotesError(Exception):
+    """A failure that must stop the run rather than yield a partial changelog."""
+
+
+def project_pr(pr: Dict) -> Dict:
+    """The fields of a REST PR object that either subcommand reads.
+
+    What the cache stores, and the shape a GraphQL node is mapped onto, so a
+    PR looks the same wherever it came from.
+    """
+    return {
+        "number": pr["number"],
+        "title": pr.get("title"),
+        "body": pr.get("body"),
+        "html_url": pr.get("html_url"),
+        "merged_at": pr.get("merged_at"),
+        "merge_commit_sha": pr.get("merge_commit_sha"),
+        "user": {"login": (pr.get("user") or {}).get("login")},
+        "labels": [{"name": lbl.get("name", "")} for lbl in pr.get("labels") or []],
+    }
+
+
+class Note(NamedTuple):
+    """One closed release-note block, as `NoteRecord` keeps it."""
+
+    key: Optional[str]
+    text: str
 
-    Returns None when there is no block at all — distinct from a block holding
-    NONE, which is a deliberate "no user-facing change" and a valid answer.
+
+class NoteRecord:
+    """What `aggregate` keeps of one merged PR: its parsed notes, labels and
+    merge order.
+
+    Built the moment the PR arrives, so the description it was parsed from —
+    usually most of a PR's bytes — is dropped with the page that carried it,
+    rather than held for every PR in the range until the fetch is done. Slotted:
+    a range can run to tens of thousands of these.
+
+    As JSON, also what `validate --record-note` leaves on the merge commit,
+    so a release read from git notes and one fetched fresh are the same thing.
     """
-    match = RELEASE_NOTE_RE.search(body or "")
-    if not match:
+
+    __slots__ = ("number", "url", "labels", "notes", "seq", "repo")
+
+    def __init__(self, number: int, url: Optional[str], labels: Tuple[str, ...],
+                 notes: Tuple[Note, ...], seq: int = 0):
+        self.number = number
+        self.url = url
+        self.labels = labels
+        self.notes = notes
+        self.seq = seq
+        # Set only when one changelog spans several repositories.
+        self.repo: Optional[str] = None
+
+    @classmethod
+    def from_pr(cls, pr: Dict, seq: int = 0) -> "NoteRecord":
+        return cls(
+            pr["number"],
+            pr.get("html_url"),
+            # A handful of label names recur across every PR in a range.
+            tuple(sys.intern(lbl.get("name", "")) for lbl in pr.get("labels") or []),
+            tuple(Note(p["key"], p["text"]) for p in parse_release_notes(pr.get("body") or "")),
+            seq,
+        )
+
+    @classmethod
+    def from_json(cls, line: Dict) -> "NoteRecord":
+        return cls(
+            line["number"],
+            line.get("url"),
+            tuple(line.get("labels") or ()),
+            tuple(Note(p.get("key"), p["text"]) for p in line["release_notes"]),
+            line.get("seq", 0),
+        )
+
+    def as_json(self) -> Dict:
+        """The record as a JSON object."""
+        return {
+            "seq": self.seq,
+            "number": self.number,
+            "url": self.url,
+            "labels": list(self.labels),
+            "release_notes": [note._asdict() for note in self.notes],
+        }
+
+
+def read_event(path: Optional[str]) -> Optional[Dict]:
+    """The webhook payload Actions leaves at $GITHUB_EVENT_PATH, if any."""
+    if not path:
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def event_pr(event: Optional[Dict], number: int) -> Optional[Dict]:
+    """The event's PR, when it is a `pull_request` event for PR `number`."""
+    pr = (event or {}).get("pull_request")
+    if not pr or pr.get("number") != number:
         return None
+    return project_pr(pr)
+
+
+def block_digest(body: str) -> str:
+    """A short digest of what the release-note blocks say, not of the body."""
+    parsed = parse_release_notes(body)
+    return hashlib.sha256(json.dumps(parsed, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def block_unchanged(event: Optional[Dict], body: str) -> bool:
+    """Whether the event shows the block as it was when last validated.
+
+    Only `edited` can change the body; its payload holds the previous one when
+    it did. Any other action on a PR the check has already seen leaves the
+    block as it was. `opened` and `reopened` are first sightings.
+    """
+    action = (event or {}).get("action")
+    if action in (None, "opened", "reopened"):
+        return False
+    previous = ((event.get("changes") or {}).get("body") or {}).get("from")
+    if action != "edited" or previous is None:
+        return True
+    return block_digest(previous) == block_digest(body)
+
+
+def default_cache_path() -> str:
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "murmur", "release-notes.sqlite3")
+
+
+class PRCache:
+    """Projected PRs as last fetched, in a SQLite file, keyed by repo and number.
+
+    Each row carries the PR's `updated_at` and, when it came from REST, its
+    ETag — the two ways to ask GitHub "has this changed?" without paying for
+    the answer. A merged PR almost never changes, so after the first run a
+    release costs a freshness check rather than a crawl.
+
+    Rows unused for `max_age_days` are dropped, then the least recently used
+    beyond `max_entries`. `refresh` skips reads but still writes, to rebuild
+    the cache from the API without deleting it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age_days: float = 90,
+        max_entries: int = 20000,
+        refresh: bool = False,
+    ):
+        import sqlite3
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS prs (
+                repo TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                updated_at TEXT,
+                etag TEXT,
+                data TEXT NOT NULL,
+                used_at REAL NOT NULL,
+                PRIMARY KEY (repo, number)
+            )"""
+        )
+        self.refresh = refresh
+        self.evict(max_age_days, max_entries)
+
+    def evict(self, max_age_days: float, max_entries: int) -> None:
+        with self.db:
+            self.db.execute(
+                "DELETE FROM prs WHERE used_at < ?", (time.time() - max_age_days * 86400,)
+            )
+            self.db.execute(
+                "DELETE FROM prs WHERE rowid NOT IN "
+                "(SELECT rowid FROM prs ORDER BY used_at DESC LIMIT ?)",
+                (max_entries,),
+            )
+
+    def get_many(self, repo: str, numbers: List[int]) -> Dict[int, Dict]:
+        """Cached rows for `numbers` as {number: {pr, updated_at, etag}}."""
+        if self.refresh or not numbers:
+            return {}
+        rows: Dict[int, Dict] = {}
+        # SQLite caps bound parameters per statement; stay well under it.
+        for start in range(0, len(numbers), 500):
+            chunk = numbers[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for number, updated_at, etag, data in self.db.execute(
+                f"SELECT number, updated_at, etag, data FROM prs "
+                f"WHERE repo = ? AND number IN ({marks})",
+                [repo, *chunk],
+            ):
+                rows[number] = {"pr": json.loads(data), "updated_at": updated_at, "etag": etag}
+        return rows
+
+    def get(self, repo: str, number: int) -> Optional[Dict]:
+        return self.get_many(repo, [number]).get(number)
+
+    def put(self, repo: str, pr: Dict, updated_at: Optional[str], etag: Optional[str] = None) -> None:
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO prs VALUES (?, ?, ?, ?, ?, ?)",
+                (repo, pr["number"], updated_at, etag, json.dumps(pr), time.time()),
+            )
+
+    def touch(self, repo: str, numbers: List[int]) -> None:
+        """Mark rows as used, so eviction keeps what recent runs still read."""
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                "UPDATE prs SET used_at = ? WHERE repo = ? AND number = ?",
+                [(now, repo, n) for n in numbers],
+            )
+
+
+class MergeCommit(NamedTuple):
+    """A PR as git records it: the commit that merged it, and when (committer
+    time, Unix seconds)."""
+
+    number: int
+    sha: str
+    committed: int
+
+
+class RepoRange(NamedTuple):
+    """One repository's part of a release: `owner/name=path:from..to`."""
+
+    repo: str
+    path: str
+    from_ref: str
+    to_ref: str
+
+    @classmethod
+    def parse(cls, spec: str) -> "RepoRange":
+        repo, _, rest = spec.partition("=")
+        path, _, refs = rest.rpartition(":")
+        from_ref, _, to_ref = refs.partition("..")
+        if repo.count("/") != 1 or not path or not from_ref or not to_ref:
+            raise argparse.ArgumentTypeError(f"{spec!r} is not owner/name=path:from..to")
+        return cls(repo, path, from_ref, to_ref)
+
+
+def git_log_records(args: List[str], fields: int, cwd: Optional[str] = None) -> Iterator[List[str]]:
+    """Stream `git log -z` records, each split into `fields` fields.
+
+    `args` must carry a `--format` separating its fields with %x1f; the last
+    field takes whatever remains, so it may be free text such as a subject.
+    Runs in `cwd`, the current directory by default.
+    Output is read off the pipe a chunk at a time, so memory holds one chunk
+    and not the whole log. Raises CalledProcessError once the stream ends if
+    git failed.
+    """
+    import tempfile
+
+    # stderr goes to a file, not a second pipe: a pipe nobody reads until
+    # stdout ends would stall git, and this with it, once it filled.
+    errors = tempfile.TemporaryFile()
+    proc = subprocess.Popen(["git", "log", "-z", *args], stdout=subprocess.PIPE, stderr=errors, cwd=cwd)
+    tail = b""
+    try:
+        while True:
+            chunk = proc.stdout.read(1 << 16)
+            if not chunk:
+                break
+            # Decode whole records a chunk at a time: a NUL never falls inside
+            # a multi-byte character, and one decode beats one per record.
+            done, _, tail = (tail + chunk).rpartition(b"\0")
+            if done:
+                for record in done.decode("utf-8", "replace").split("\0"):
+                    yield record.split("\x1f", fields - 1)
+        if tail:
+            yield tail.decode("utf-8", "replace").split("\x1f", fields - 1)
+    finally:
+        proc.stdout.close()
+        code = proc.wait()
+        errors.seek(0)
+        stderr = errors.read().decode("utf-8", "replace")
+        errors.close()
+        if code != 0:
+            raise subprocess.CalledProcessError(code, proc.args, stderr=stderr)
+
+
+def merge_commits(records: Iterable[List[str]]) -> Iterator[MergeCommit]:
+    """The PR merges among `[sha, committed, subject]` records, in walk order."""
+    squash, merge = SQUASH_SUBJECT_RE.search, MERGE_SUBJECT_RE.match
+    for sha, committed, subject in records:
+        match = squash(subject) or merge(subject)
+        if match:
+            yield MergeCommit(int(match.group(1)), sha, int(committed))
+
+
+# Where `validate --record-note` keeps each merged PR's parsed notes: on its
+# merge commit, so `aggregate` can read a range from the clone alone.
+NOTES_REF = "refs/notes/release-notes"
+
+
+class GitNotes:
+    """Parsed release notes attached to merge commits with `git notes`.
+
+    A note is the PR's `NoteRecord` as a JSON line, less `seq`, written
+    when the PR merges. The description can be edited after that; the note
+    still says what merged.
+    """
+
+    def __init__(self, ref: str = NOTES_REF, remote: str = "origin", cwd: Optional[str] = None):
+        self.ref = ref
+        self.remote = remote
+        self.cwd = cwd
+
+    def read(self, shas: Iterable[str]) -> Dict[str, NoteRecord]:
+        """The records noted on those of `shas` that carry one.
+
+        Two git processes however long the range: `git notes list` maps every
+        noted commit to its note blob, and one `cat-file --batch` reads the
+        wanted blobs.
+        """
+        wanted = set(shas)
+        try:
+            listed = subprocess.run(
+                ["git", "notes", "--ref", self.ref, "list"],
+                capture_output=True, text=True, check=True, cwd=self.cwd,
+            ).stdout
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            # No git, or not a repository: every PR comes from the API.
+            return {}
+        blobs: List[Tuple[str, str]] = []
+        for line in listed.splitlines():
+            blob, _, commit = line.partition(" ")
+            if commit in wanted:
+                blobs.append((blob, commit))
+        if not blobs:
+            return {}
+
+        out = subprocess.run(
+            ["git", "cat-file", "--batch"],
+            input="".join(f"{blob}\n" for blob, _ in blobs).encode(),
+            capture_output=True, check=True, cwd=self.cwd,
+        ).stdout
+        records: Dict[str, NoteRecord] = {}
+        pos = 0
+        for _, commit in blobs:
+            eol = out.index(b"\n", pos)
+            size = int(out[pos:eol].split()[2])
+            data, pos = out[eol + 1:eol + 1 + size], eol + 1 + size + 1
+            try:
+                records[commit] = NoteRecord.from_json(json.loads(data))
+            except (ValueError, KeyError, TypeError):
+                # Not a note this script wrote; the API knows the PR.
+                continue
+        return records
+
+    def write(self, sha: str, record: NoteRecord) -> None:
+        line = record.as_json()
+        del line["seq"]
+        subprocess.run(
+            ["git", "notes", "--ref", self.ref, "add", "-f", "-m",
+             json.dumps(line, ensure_ascii=False), sha],
+            capture_output=True, text=True, check=True, cwd=self.cwd,
+        )
+
+    def publish(self, sha: str, record: NoteRecord, attempts: int = 3) -> None:
+        """Note `sha` and push the notes ref.
+
+        Each attempt starts from the remote's notes, so a push only fails when
+        another merge's note landed in between; that is retried.
+        """
+        for _ in range(attempts):
+            # Fails harmlessly before the first note exists anywhere.
+            subprocess.run(
+                ["git", "fetch", "--quiet", self.remote, f"+{self.ref}:{self.ref}"],
+                capture_output=True, cwd=self.cwd,
+            )
+            self.write(sha, record)
+            push = subprocess.run(
+                ["git", "push", "--quiet", self.remote, self.ref],
+                capture_output=True, text=True, cwd=self.cwd,
+            )
+            if push.returncode == 0:
+                return
+        raise ReleaseNotesError(f"cannot push {self.ref}: {push.stderr.strip()}")
+
+
+class Tracer:
+    """Spans and counters for one run, in the shape the runtime's `otel.rs`
+    posts: an OTLP/JSON `resourceSpans` payload, one trace per run.
+
+    Each phase — git walk, fetch, parse, categorize, group, render — is a
+    child of the run's root span, and every HTTP request is a child of the
+    phase that made it, carrying endpoint, status, latency, bytes and the rate
+    limit left. `--trace FILE` writes the payload, ready to POST to a
+    collector's `/v1/traces`; `--metrics FILE` writes the same run summarised:
+    time per phase, request totals per endpoint, and counters such as cache
+    hits and retries.
+    """
+
+    SCOPE = "murmur-release-notes"
+
+    def __init__(self, command: str = "", keep_spans: bool = True):
+        self.trace_id = os.urandom(16).hex()
+        self.root_id = os.urandom(8).hex()
+        self.start_ns = time.time_ns()
+        self.command = command
+        self.spans: List[Dict] = []
+        # Off for `serve`: a daemon has no end of run to write them at, and
+        # would hold every span it ever made.
+        self.keep_spans = keep_spans
+        self.counters: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        # Each thread's open spans, innermost last. A thread working for
+        # another — a scheduler worker, a repository's walk — is `attach`ed
+        # to the span it works for.
+        self.local = threading.local()
+
+    def _active(self) -> List[str]:
+        return self.local.__dict__.setdefault("active", [])
+
+    def current(self) -> str:
+        """The innermost span open on this thread, or the root."""
+        active = self._active()
+        return active[-1] if active else self.root_id
+
+    @contextmanager
+    def attach(self, parent: str):
+        """Parent spans and requests made on this thread to `parent`, a span
+        open on another."""
+        active = self._active()
+        active.append(parent)
+        try:
+            yield
+        finally:
+            active.pop()
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time the block as a span; the yielded dict takes more attributes."""
+        span_id = os.urandom(8).hex()
+        parent = self.current()
+        active = self._active()
+        active.append(span_id)
+        start = time.time_ns()
+        status = 1
+        try:
+            yield attrs
+        except BaseException:
+            status = 2
+            raise
+        finally:
+            active.pop()
+            self._add(span_id, parent, name, start, time.time_ns(), attrs, status)
+
+    def request(self, method: str, url: str, start_ns: int, resp=None) -> None:
+        """Record one HTTP attempt; `resp` is None when it never got an answer."""
+        path = re.sub(r"/\d+(?=/|$)", "/{n}", url.split("://", 1)[-1].split("/", 1)[-1].split("?")[0])
+        attrs = {"http.method": method, "endpoint": f"/{path}"}
+        if resp is not None:
+            attrs["http.status_code"] = resp.status_code
+            attrs["bytes"] = len(resp.content)
+            remaining = resp.headers.get("X-RateLimit-Remaining")
+            if remaining is not None:
+                attrs["ratelimit.remaining"] = int(remaining)
+        end = time.time_ns()
+        attrs["duration_ms"] = (end - start_ns) // 1_000_000
+        parent = self.current()
+        failed = resp is None or resp.status_code >= 400
+        self._add(os.urandom(8).hex(), parent, "release_notes.request", start_ns, end, attrs,
+                  2 if failed else 1)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _add(self, span_id, parent, name, start, end, attrs, status) -> None:
+        if not self.keep_spans:
+            return
+        span = {
+            "traceId": self.trace_id,
+            "spanId": span_id,
+            "parentSpanId": parent,
+            "name": name,
+            "kind": 1,
+            "startTimeUnixNano": str(start),
+            "endTimeUnixNano": str(end),
+            "attributes": [_kv(k, v) for k, v in attrs.items()],
+            "status": {"code": status},
+        }
+        with self.lock:
+            self.spans.append(span)
+
+    def otlp(self, exit_code: int) -> Dict:
+        """The run as an OTLP/JSON traces payload, root span included."""
+        root = {
+            "traceId": self.trace_id,
+            "spanId": self.root_id,
+            "name": "release_notes.run",
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(time.time_ns()),
+            "attributes": [_kv("command", self.command), _kv("exit_code", exit_code)]
+            + [_kv(k, v) for k, v in sorted(self.counters.items())],
+            "status": {"code": 1 if exit_code == 0 else 2},
+        }
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_kv("service.name", "release-notes")]},
+                "scopeSpans": [{"scope": {"name": self.SCOPE}, "spans": [root, *self.spans]}],
+            }]
+        }
+
+    def metrics(self, exit_code: int) -> Dict:
+        """The run summarised: phase timings, request totals, counters.
+
+        A phase's time is the wall time its spans cover, so the same phase
+        running for several repositories at once counts once.
+        """
+        intervals: Dict[str, List[Tuple[int, int]]] = {}
+        endpoints: Dict[str, Dict] = {}
+        for span in self.spans:
+            start, end = int(span["startTimeUnixNano"]), int(span["endTimeUnixNano"])
+            ms = (end - start) / 1e6
+            attrs = {a["key"]: _kv_value(a) for a in span["attributes"]}
+            if span["name"] != "release_notes.request":
+                intervals.setdefault(span["name"].split(".", 1)[-1], []).append((start, end))
+                continue
+            stats = endpoints.setdefault(
+                f"{attrs['http.method']} {attrs['endpoint']}",
+                {"requests": 0, "bytes": 0, "ms": 0.0, "statuses": {}},
+            )
+            stats["requests"] += 1
+            stats["bytes"] += attrs.get("bytes", 0)
+            stats["ms"] = round(stats["ms"] + ms, 3)
+            status = str(attrs.get("http.status_code", "error"))
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+            if "ratelimit.remaining" in attrs:
+                self.counters["ratelimit.remaining"] = attrs["ratelimit.remaining"]
+        return {
+            "command": self.command,
+            "exit_code": exit_code,
+            "wall_ms": round((time.time_ns() - self.start_ns) / 1e6, 3),
+            "phases_ms": {
+                phase: round(_covered(spans) / 1e6, 3) for phase, spans in intervals.items()
+            },
+            "requests": {
+                "total": sum(e["requests"] for e in endpoints.values()),
+                "bytes": sum(e["bytes"] for e in endpoints.values()),
+                "by_endpoint": endpoints,
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+def _covered(intervals: List[Tuple[int, int]]) -> int:
+    """How much of the timeline the `(start, end)` intervals cover together."""
+    total = reach = 0
+    for start, end in sorted(intervals):
+        if end > reach:
+            total += end - max(start, reach)
+            reach = end
+    return total
+
+
+def _kv(key: str, value) -> Dict:
+    # Integers as decimal strings, per the OTLP proto3 JSON mapping.
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _kv_value(attr: Dict):
+    (kind, value), = attr["value"].items()
+    return int(value) if kind == "intValue" else value
+
+
+class RequestError(Exception):
+    """An HTTP request that failed: unanswered, or answered with an error."""
+
+
+class TransportError(RequestError):
+    """No answer at all — refused, reset or timed out. Worth retrying."""
+
+
+class Response:
+    """An answered request: what the script reads of one, fully read."""
+
+    def __init__(
+        self, method: str, url: str, status: int, reason: str,
+        headers: http.client.HTTPMessage, content: bytes,
+    ):
+        self.method = method
+        self.url = url
+        self.status_code = status
+        self.reason = reason
+        # Looked up without regard to case, as HTTP header names are.
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise RequestError(
+                f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}"
+            )
+
+
+class HTTPTransport:
+    """Sends requests over `http.client`, from a pool of keep-alive connections
+    shared by every thread.
+
+    A request takes an idle connection to its host, or opens one, and puts it
+    back when the response is read; up to `maxsize` idle ones are kept per
+    host, as many as the scheduler runs workers. The pool outlives the worker
+    threads `RequestScheduler.map` starts, so one round's connections serve
+    the next.
+
+    HTTPS_PROXY, HTTP_PROXY and NO_PROXY are honoured as `urllib` reads them:
+    an https host is reached through a CONNECT tunnel, an http one by sending
+    the proxy the absolute URL.
+    """
+
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self.proxies: Dict[Tuple[str, str], Optional[urllib.parse.SplitResult]] = {}
+
+    def proxy(self, scheme: str, host: str) -> Optional[urllib.parse.SplitResult]:
+        """The proxy for `scheme://host`, or None to connect directly."""
+        key = (scheme, host)
+        if key not in self.proxies:
+            # Deferred: only a run that connects anywhere pays for urllib.request.
+            import urllib.request
+
+            url = urllib.request.getproxies().get(scheme)
+            if url and not urllib.request.proxy_bypass(host):
+                self.proxies[key] = urllib.parse.urlsplit(url if "://" in url else f"http://{url}")
+            else:
+                self.proxies[key] = None
+        return self.proxies[key]
+
+    @staticmethod
+    def proxy_headers(proxy: urllib.parse.SplitResult) -> Dict[str, str]:
+        if proxy.username is None:
+            return {}
+        import base64
+
+        user = urllib.parse.unquote(proxy.username) + ":" + urllib.parse.unquote(proxy.password or "")
+        return {"Proxy-Authorization": "Basic " + base64.b64encode(user.encode()).decode("ascii")}
+
+    def _checkout(self, scheme: str, host: str, timeout: float) -> http.client.HTTPConnection:
+        with self.lock:
+            idle = self.idle.get((scheme, host))
+            if idle:
+                return idle.pop()
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        proxy = self.proxy(scheme, host)
+        if proxy is None:
+            return cls(host, timeout=timeout)
+        port = proxy.port or (443 if proxy.scheme == "https" else 80)
+        if scheme != "https":
+            return cls(proxy.hostname, port, timeout=timeout)
+        # TCP to the proxy, CONNECT to the host, then TLS to the host through it.
+        conn = cls(proxy.hostname, port, timeout=timeout)
+        conn.set_tunnel(host, headers=self.proxy_headers(proxy))
+        return conn
+
+    def _checkin(self, scheme: str, host: str, conn: http.client.HTTPConnection) -> None:
+        with self.lock:
+            idle = self.idle.setdefault((scheme, host), [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def send(self, method: str, url: str, body: Optional[bytes], headers: Dict, timeout: float) -> Response:
+        parts = urllib.parse.urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        proxy = self.proxy(parts.scheme, parts.netloc)
+        if proxy is not None and parts.scheme != "https":
+            target = url
+            headers = {**headers, **self.proxy_headers(proxy)}
+        conn = self._checkout(parts.scheme, parts.netloc, timeout)
+        # A kept-alive connection the server has since closed fails on first
+        # use; that is not the request failing, so it gets one fresh attempt.
+        for fresh in (conn.sock is None, True):
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                raw = conn.getresponse()
+                content = raw.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                conn.close()
+                if fresh:
+                    raise TransportError(f"{method} {url}: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise TransportError(f"{method} {url}: {e}") from e
+        if raw.will_close:
+            conn.close()
+        else:
+            self._checkin(parts.scheme, parts.netloc, conn)
+        if raw.getheader("Content-Encoding") == "gzip":
+            content = zlib.decompress(content, 16 + zlib.MAX_WBITS)
+        return Response(method, url, raw.status, raw.reason, raw.msg, content)
+
+
+class Session:
+    """The slice of `requests.Session` the script uses — default headers,
+    `params=` and `json=` — over a transport: `HTTPTransport`, or one of the
+    cassette transports below.
+    """
 
-    key_match = KEY_RE.search(match.group("attrs"))
-    # Newlines are collapsed: a note wrapped across lines in the PR textarea is
-    # still one sentence, and a changelog bullet is one line.
-    text = " ".join(match.group("body").split())
-    return {"key": key_match.group("key") if key_match else None, "text": text}
+    def __init__(self, transport=None):
+        self.transport = transport or HTTPTransport()
+        self.headers = {
+            "User-Agent": "murmur-release-notes",
+            "Accept": "application/vnd.github+json",
+            "Accept-Encoding": "gzip",
+        }
+
+    def request(
+        self, method: str, url: str, params: Optional[Dict] = None,
+        headers: Optional[Dict] = None, timeout: float = 30, **kwargs,
+    ) -> Response:
+        if params:
+            url += ("&" if "?" in url else "?") + urllib.parse.urlencode(params)
+        sent = {**self.headers, **(headers or {})}
+        body = None
+        if "json" in kwargs:
+            body = json.dumps(kwargs["json"]).encode("utf-8")
+            sent["Content-Type"] = "application/json"
+        return self.transport.send(method, url, body, sent, timeout)
+
+
+class RequestScheduler:
+    """Every HTTP call the script makes goes through here.
+
+    Connections are kept alive in the transport's pool, and `map` runs
+    independent requests concurrently on `workers` threads. The scheduler reads
+    the rate-limit headers off every response and, as `X-RateLimit-Remaining`
+    nears zero, spaces requests out over the time left to the reset rather than
+    running into the wall. A 429, a 5xx, a secondary rate limit or a dropped
+    connection is retried with jittered exponential backoff, honouring
+    `Retry-After`.
+
+    What still fails after `max_retries` is raised, never swallowed: a fetch
+    that gave up must fail the run, not render a changelog missing the PRs it
+    could not read.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # Below this many requests left in the window, start pacing.
+    RESERVE = 50
+    # Waiting longer than this for a rate-limit reset fails the run instead.
+    MAX_WAIT = 15 * 60
+
+    WORKERS = 8
+
+    def __init__(
+        self,
+        session: "Session",
+        workers: int = WORKERS,
+        max_retries: int = 5,
+        timeout: float = 30,
+        tracer: Optional[Tracer] = None,
+    ):
+        self.session = session
+        self.workers = workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.next_slot = 0.0
+        self.tracer = tracer or Tracer()
+        self.requests = 0
+        self.retries = 0
+
+    def get(self, url: str, **kwargs) -> "Response":
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> "Response":
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> "Response":
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> "Response":
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> "Response":
+        return self.request("DELETE", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> "Response":
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            self._throttle()
+            start = time.time_ns()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except TransportError:
+                self.tracer.request(method, url, start)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                self.tracer.request(method, url, start, resp)
+                with self.lock:
+                    self.requests += 1
+                self._observe(resp)
+                delay = self._retry_delay(resp, attempt)
+                if delay is None:
+                    return resp
+            attempt += 1
+            with self.lock:
+                self.retries += 1
+            self.tracer.count("http.retries")
+            time.sleep(delay)
+
+    def map(self, fn: Callable, items: Iterable) -> List:
+        """`fn` over `items` on the worker pool; results in input order."""
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as pool:
+            return list(pool.map(self._traced(fn), items))
+
+    def imap(self, fn: Callable, items: Iterable) -> Iterator:
+        """`map`, yielding each result as soon as it and those before it are in.
+
+        At most `workers` calls run ahead of the caller, so a long fetch holds a
+        pool's width of responses at a time rather than all of them.
+        """
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        traced = self._traced(fn)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for item in items:
+                pending.append(pool.submit(traced, item))
+                if len(pending) >= self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _traced(self, fn: Callable) -> Callable:
+        """`fn`, run on a worker under the caller's innermost span."""
+        parent = self.tracer.current()
+
+        def traced(item):
+            with self.tracer.attach(parent):
+                return fn(item)
+
+        return traced
+
+    def _observe(self, resp: "Response") -> None:
+        remaining = resp.headers.get("X-RateLimit-Remaining")
+        reset = resp.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        with self.lock:
+            self.remaining = int(remaining)
+            self.reset_at = float(reset)
+
+    def _throttle(self) -> None:
+        with self.lock:
+            now = time.time()
+            if self.remaining is None or self.remaining > self.RESERVE:
+                return
+            window = max(self.reset_at - now, 0.0)
+            if self.remaining <= 0:
+                wait = window
+            else:
+                # Spread what is left evenly over the rest of the window; each
+                # caller takes the next free slot.
+                self.next_slot = max(self.next_slot, now) + window / self.remaining
+                self.remaining -= 1
+                wait = self.next_slot - now
+        if wait > self.MAX_WAIT:
+            raise RequestError(
+                f"GitHub rate limit exhausted; it resets in {int(wait)}s"
+            )
+        if wait > 0:
+            time.sleep(wait)
+
+    def _retry_delay(self, resp: "Response", attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying `resp`, or None to hand it back."""
+        status = resp.status_code
+        if status == 403:
+            limited = (
+                "Retry-After" in resp.headers
+                or resp.headers.get("X-RateLimit-Remaining") == "0"
+                or "rate limit" in resp.text.lower()
+            )
+            if not limited:
+                return None
+        elif status not in self.RETRY_STATUSES:
+            return None
+        if attempt >= self.max_retries:
+            return None
+
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        if resp.headers.get("X-RateLimit-Remaining") == "0":
+            wait = float(resp.headers.get("X-RateLimit-Reset", 0)) - time.time()
+            if wait > self.MAX_WAIT:
+                return None
+            return max(wait, 1.0)
+        return self._backoff(attempt)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        # Full jitter: concurrent workers that failed together don't retry in
+        # lockstep.
+        return random.uniform(0, min(60.0, 2.0 ** attempt))
+
+
+class RecordingTransport(HTTPTransport):
+    """The live transport, appending every exchange to a cassette as it goes.
+
+    One JSON object per line: method, URL and request body; status, headers
+    and body of the response. Request headers are left out — the token is one.
+    A first line, written by `begin`, names the route the run fetches PRs by.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.lock = threading.Lock()
+        open(path, "w").close()
+
+    def begin(self, route: str) -> None:
+        with self.lock, open(self.path, "a") as f:
+            f.write(json.dumps({"route": route}) + "\n")
+
+    def send(self, method: str, url: str, body: Optional[bytes], headers: Dict, timeout: float) -> Response:
+        resp = super().send(method, url, body, headers, timeout)
+        exchange = {
+            "method": method,
+            "url": url,
+            "body": _text(body),
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "headers": dict(resp.headers),
+            "response": resp.text,
+        }
+        with self.lock, open(self.path, "a") as f:
+            f.write(json.dumps(exchange, ensure_ascii=False) + "\n")
+        return resp
+
+
+class ReplayTransport:
+    """Answers from a cassette written by `RecordingTransport`; never dials out.
+
+    Exchanges are matched on method, path, query and request body, so a
+    cassette recorded against one API host replays against another. The same
+    request made more than once gets the recorded answers in order, the last
+    repeating, so a recorded retry replays as one. Rate-limit headers are
+    dropped: nothing here is rate limited, and pacing a replay would only slow
+    it down. A request the cassette doesn't hold fails the run, without
+    retries: asking again won't put it there.
+
+    `route` is the one the recording fetched PRs by, whatever token the replay
+    has; None for a cassette that doesn't say.
+    """
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.route: Optional[str] = None
+        self.exchanges: Dict[Tuple[str, str, str], List[Dict]] = {}
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                exchange = json.loads(line)
+                if "method" not in exchange:
+                    self.route = exchange.get("route")
+                    continue
+                key = (exchange["method"], self.target(exchange["url"]), exchange["body"])
+                self.exchanges.setdefault(key, []).append(exchange)
+
+    @staticmethod
+    def target(url: str) -> str:
+        parts = urllib.parse.urlsplit(url)
+        return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+    def send(self, method: str, url: str, body: Optional[bytes], headers: Dict, timeout: float) -> Response:
+        key = (method, self.target(url), _text(body))
+        with self.lock:
+            queue = self.exchanges.get(key)
+            if not queue:
+                raise RequestError(f"{method} {url} is not in the cassette")
+            exchange = queue.pop(0) if len(queue) > 1 else queue[0]
+
+        recorded = http.client.HTTPMessage()
+        for name, value in exchange["headers"].items():
+            if not name.lower().startswith("x-ratelimit-") and name.lower() != "retry-after":
+                recorded[name] = value
+        return Response(
+            method, url, exchange["status"], exchange["reason"], recorded,
+            exchange["response"].encode("utf-8"),
+        )
+
+
+def _text(body) -> str:
+    if body is None:
+        return ""
+    return body.decode("utf-8", "replace") if isinstance(body, bytes) else body
+
+
+class Categorized(NamedTuple):
+    """The section a note is filed under, and why: the rule that fired and
+    the label or words it matched. `rule` is None for the default section.
+    """
+
+    category: str
+    rule: Optional[str]
+    match: Optional[str]
+
+
+class CategoryRules:
+    """The rules of a `release-notes.toml`, compiled for one pass per note.
+
+    Every wording rule becomes one alternative of a single case-insensitive
+    pattern, tried at each position of the note inside a lookahead: where
+    several match at one position the earliest listed wins, so the earliest
+    over all positions is the wording rule that fires. Label rules fold into
+    one dict. More rules are more alternatives, not more passes.
+    """
+
+    def __init__(self, config: Dict, source: str = "<config>"):
+        self.source = source
+        self.categories = list(config.get("categories") or [])
+        if not self.categories:
+            raise ReleaseNotesError(f"{source}: `categories` lists no sections")
+        self.default = self._category(config.get("default", self.categories[-1]), "default")
+
+        self.names: List[str] = []
+        self.wording: List[Optional[str]] = []
+        # label -> (rule index, category), the earliest rule naming it.
+        self.labels: Dict[str, Tuple[int, str]] = {}
+        alternatives = []
+        for index, rule in enumerate(config.get("rule") or []):
+            name = rule.get("name") or f"rule {index + 1}"
+            self.names.append(name)
+            for label, category in (rule.get("labels") or {}).items():
+                self.labels.setdefault(label, (index, self._category(category, name)))
+
+            patterns = []
+            if rule.get("words"):
+                words = "|".join(re.escape(word) for word in rule["words"])
+                patterns.append(rf"\b(?:{words})\b")
+            if rule.get("regex"):
+                try:
+                    re.compile(rule["regex"])
+                except re.error as e:
+                    raise ReleaseNotesError(f"{source}: rule {name!r}: bad regex: {e}")
+                patterns.append(f"(?:{rule['regex']})")
+            if patterns:
+                self.wording.append(self._category(rule.get("category"), name))
+                alternatives.append(f"(?P<r{index}>{'|'.join(patterns)})")
+            elif rule.get("labels"):
+                self.wording.append(None)
+            else:
+                raise ReleaseNotesError(f"{source}: rule {name!r} has no labels, words or regex")
+
+        self.matcher = (
+            re.compile("(?=" + "|".join(alternatives) + ")", re.IGNORECASE) if alternatives else None
+        )
+
+    def _category(self, category: Optional[str], rule: str) -> str:
+        if category not in self.categories:
+            raise ReleaseNotesError(
+                f"{self.source}: {rule}: {category!r} is not one of the categories"
+            )
+        return category
+
+    @classmethod
+    def load(cls, path: str) -> "CategoryRules":
+        try:
+            import tomllib
+        except ImportError:
+            raise ReleaseNotesError(f"reading {path} needs Python 3.11 or later (tomllib)")
+        try:
+            with open(path, "rb") as f:
+                return cls(tomllib.load(f), path)
+        except (OSError, tomllib.TOMLDecodeError) as e:
+            raise ReleaseNotesError(f"cannot read category rules: {e}")
+
+    def categorize(self, note: str, labels: Iterable[str] = ()) -> Categorized:
+        """The first rule, in file order, that matches the note or its labels."""
+        best: Optional[Tuple[int, str, str]] = None
+        if self.matcher:
+            for match in self.matcher.finditer(note):
+                index = int(match.lastgroup[1:])
+                if best is None or index < best[0]:
+                    best = (index, self.wording[index], match.group(match.lastgroup))
+                    if index == 0:
+                        break
+        for label in labels:
+            hit = self.labels.get(label)
+            if hit and (best is None or hit[0] < best[0]):
+                best = (hit[0], hit[1], label)
+        if best is None:
+            return Categorized(self.default, None, None)
+        return Categorized(best[1], self.names[best[0]], best[2])
+
+
+class NoteIndex:
+    """Near-duplicate release notes, for suggesting a shared `key=`.
+
+    A note is reduced to its set of content words, and that set to a MinHash
+    signature. Signatures are cut into bands and each band hashed to a
+    bucket: two notes are only ever compared when some band of theirs
+    collides, which happens with high probability above about `threshold`
+    Jaccard similarity and rarely below. So a lookup costs the size of its
+    buckets, not the size of the index, and clustering N notes is nowhere
+    near N² comparisons.
+    """
+
+    BANDS = 21
+    ROWS = 3
+    PRIME = (1 << 61) - 1
+    STOPWORDS = frozenset(
+        "the and for from with that this when into its now can are was not but "
+        "than then them they their which where what who per via one all any "
+        "instead rather only also add adds added fix fixes fixed set new".split()
+    )
+
+    def __init__(self, threshold: float = 0.4):
+        self.threshold = threshold
+        # One (a·x + b) mod p per signature row, seeded so runs agree.
+        rng = random.Random(0x5EED)
+        self._hashes = [
+            (rng.randrange(1, self.PRIME), rng.randrange(self.PRIME))
+            for _ in range(self.BANDS * self.ROWS)
+        ]
+        self.items: List[Dict] = []
+        self._words: List[frozenset] = []
+        self._buckets: Dict[Tuple, List[int]] = {}
+
+    @classmethod
+    def words(cls, text: str) -> frozenset:
+        return frozenset(
+            w for w in re.findall(r"[a-z0-9_]+", text.lower())
+            if len(w) > 2 and w not in cls.STOPWORDS
+        )
+
+    def _bands(self, words: frozenset) -> List[Tuple]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(w.encode(), digest_size=8).digest(), "big") % self.PRIME
+            for w in words
+        ]
+        if not hashes:
+            return []
+        signature = [min([(a * h + b) % self.PRIME for h in hashes]) for a, b in self._hashes]
+        return [
+            (band, tuple(signature[band * self.ROWS:(band + 1) * self.ROWS]))
+            for band in range(self.BANDS)
+        ]
+
+    def add(self, text: str, ref: str, key: Optional[str] = None, past: bool = False) -> int:
+        """Index a note; `ref` names it in reports (`#12`, `v0.2.0`)."""
+        words = self.words(text)
+        index = len(self.items)
+        self.items.append({"text": text, "ref": ref, "key": key, "past": past})
+        self._words.append(words)
+        for band in self._bands(words):
+            self._buckets.setdefault(band, []).append(index)
+        return index
+
+    def _similarity(self, a: frozenset, b: frozenset) -> float:
+        return len(a & b) / len(a | b) if a and b else 0.0
+
+    def query(self, text: str) -> List[Tuple[int, float]]:
+        """Indexed notes similar to `text`, most similar first."""
+        words = self.words(text)
+        candidates = {i for band in self._bands(words) for i in self._buckets.get(band, [])}
+        scored = [(i, self._similarity(words, self._words[i])) for i in candidates]
+        return sorted(
+            [(i, score) for i, score in scored if score >= self.threshold], key=lambda m: -m[1]
+        )
+
+    def clusters(self) -> List[List[int]]:
+        """Groups of indexed notes linked by similarity, each holding at least
+        one note that isn't `past`, largest first.
+        """
+        parent = list(range(len(self.items)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        checked = set()
+        for members in self._buckets.values():
+            for x, a in enumerate(members):
+                for b in members[x + 1:]:
+                    if (a, b) in checked or find(a) == find(b):
+                        continue
+                    checked.add((a, b))
+                    if self._similarity(self._words[a], self._words[b]) >= self.threshold:
+                        parent[find(a)] = find(b)
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(self.items)):
+            groups.setdefault(find(i), []).append(i)
+        return sorted(
+            (
+                members for members in groups.values()
+                if len(members) > 1 and not all(self.items[i]["past"] for i in members)
+            ),
+            key=len, reverse=True,
+        )
+
+    def slug(self, members: List[int]) -> str:
+        """A key for a cluster: one already in use, or the words its notes share."""
+        for i in members:
+            if self.items[i]["key"]:
+                return self.items[i]["key"]
+        shared = set.intersection(*(set(self._words[i]) for i in members))
+        first = [w for w in re.findall(r"[a-z0-9_]+", self.items[members[0]]["text"].lower())]
+        picked = []
+        for w in first:
+            if w in shared and w not in picked:
+                picked.append(w)
+        slug = "-".join(re.sub(r"[^a-z0-9]+", "-", w).strip("-") for w in picked[:3])
+        return slug or "shared-change"
+
+
+# The `Link` header of a paged REST listing, for its page count.
+LINK_LAST_RE = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+# The PR links `generate_markdown` appends to an entry, and one of them.
+PR_LINKS_RE = re.compile(r"\s*\(((?:\[(?:[\w.-]+/[\w.-]+)?#\d+\]\([^)]*\)(?:, )?)+)\)\s*$")
+PR_LINK_RE = re.compile(r"\[(?P<repo>[\w.-]+/[\w.-]+)?#(?P<number>\d+)\]\((?P<url>[^)]*)\)")
+
+
+def changelog_entries(path: str) -> Iterator[Dict]:
+    """The entries of one rendered changelog file, in the shape of an
+    `--jsonl-file` line: category, note, and the PRs it links.
+    """
+    category = None
+    with open(path) as f:
+        for line in f:
+            if line.startswith("### "):
+                category = line[4:].strip()
+                continue
+            if not line.startswith("- "):
+                continue
+            links = PR_LINKS_RE.search(line)
+            yield {
+                "category": category,
+                "key": None,
+                # The links aren't the note.
+                "note": (line[2:links.start()] if links else line[2:]).strip(),
+                "prs": [
+                    {"number": int(m.group("number")), "url": m.group("url"),
+                     **({"repo": m.group("repo")} if m.group("repo") else {})}
+                    for m in PR_LINK_RE.finditer(links.group(1) if links else "")
+                ],
+            }
+
+
+def changelog_notes(directory: str) -> Iterator[Tuple[str, str]]:
+    """(release, note) for every entry of the CHANGELOG/*.md files in `directory`."""
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".md"):
+            for entry in changelog_entries(os.path.join(directory, name)):
+                yield name[:-3], entry["note"]
+
+
+def version_key(release: str) -> Tuple:
+    """Sorts `v0.10.0` after `v0.9.0`, and anything unnumbered after both."""
+    numbers = tuple(int(n) for n in re.findall(r"\d+", release))
+    return (0, numbers) if numbers else (1, release)
+
+
+def default_index_path() -> str:
+    return os.path.join(os.path.dirname(default_cache_path()), "release-index.sqlite3")
+
+
+class ReleaseIndex:
+    """Every release's changelog entries in SQLite, searchable with FTS5.
+
+    A release is loaded whole — from `aggregate --jsonl-file` output or from
+    its rendered CHANGELOG/<tag>.md — and replaced whole when what it says
+    changes. One whose entries hash as they did last time is left alone, so
+    re-indexing the whole history after a release costs that one release.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS releases (
+            release TEXT PRIMARY KEY,
+            digest TEXT NOT NULL,
+            source TEXT,
+            indexed_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY,
+            release TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            category TEXT,
+            key TEXT,
+            note TEXT NOT NULL,
+            breaking INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_release ON entries (release);
+        CREATE TABLE IF NOT EXISTS entry_prs (
+            entry INTEGER NOT NULL,
+            number INTEGER NOT NULL,
+            url TEXT,
+            repo TEXT
+        );
+        CREATE INDEX IF NOT EXISTS entry_prs_entry ON entry_prs (entry);
+        CREATE INDEX IF NOT EXISTS entry_prs_number ON entry_prs (number);
+        -- Keyed by entries.id. Dotted names like `capabilities.resources`
+        -- tokenize to their parts, and a quoted query matches them in order.
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5 (note);
+    """
+
+    def __init__(self, path: str):
+        import sqlite3
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        try:
+            self.db.executescript(self.SCHEMA)
+        except sqlite3.OperationalError as e:
+            # The one build-dependent piece: SQLite compiled without FTS5.
+            raise ReleaseNotesError(f"cannot open release index {path}: {e}")
+
+    def load(self, release: str, entries: List[Dict], source: str) -> bool:
+        """Replace `release`'s entries; False when they are as last indexed."""
+        digest = hashlib.sha256(json.dumps(entries, sort_keys=True).encode()).hexdigest()[:16]
+        row = self.db.execute("SELECT digest FROM releases WHERE release = ?", (release,)).fetchone()
+        if row and row[0] == digest:
+            return False
+        with self.db:
+            old = "SELECT id FROM entries WHERE release = ?"
+            self.db.execute(f"DELETE FROM entries_fts WHERE rowid IN ({old})", (release,))
+            self.db.execute(f"DELETE FROM entry_prs WHERE entry IN ({old})", (release,))
+            self.db.execute("DELETE FROM entries WHERE release = ?", (release,))
+            for position, entry in enumerate(entries):
+                note = entry["note"]
+                entry_id = self.db.execute(
+                    "INSERT INTO entries (release, position, category, key, note, breaking) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (release, position, entry.get("category"), entry.get("key"), note,
+                     note.lower().startswith("breaking:")),
+                ).lastrowid
+                self.db.execute("INSERT INTO entries_fts (rowid, note) VALUES (?, ?)", (entry_id, note))
+                self.db.executemany(
+                    "INSERT INTO entry_prs VALUES (?, ?, ?, ?)",
+                    [(entry_id, pr["number"], pr.get("url"), pr.get("repo"))
+                     for pr in entry.get("prs") or []],
+                )
+            self.db.execute(
+                "INSERT OR REPLACE INTO releases VALUES (?, ?, ?, ?)",
+                (release, digest, source, time.time()),
+            )
+        return True
+
+    def releases(self) -> List[str]:
+        """Every indexed release, newest first."""
+        names = [row[0] for row in self.db.execute("SELECT release FROM releases")]
+        return sorted(names, key=version_key, reverse=True)
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        breaking: bool = False,
+        pr: Optional[int] = None,
+        since: Optional[str] = None,
+    ) -> List[Dict]:
+        """Entries matching every filter given, oldest release first — so the
+        first hit for a feature's name is the release that introduced it.
+
+        `text` is words to find in the note, in any order; each is matched as a
+        phrase, so punctuation in it is literal rather than FTS5 syntax.
+        `since` keeps releases newer than that one.
+        """
+        where, params = [], []
+        if text:
+            query = " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+            where.append("e.id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+            params.append(query)
+        if breaking:
+            where.append("e.breaking")
+        if pr is not None:
+            where.append("e.id IN (SELECT entry FROM entry_prs WHERE number = ?)")
+            params.append(pr)
+        rows = self.db.execute(
+            "SELECT e.id, e.release, e.position, e.category, e.key, e.note FROM entries e"
+            + (" WHERE " + " AND ".join(where) if where else ""),
+            params,
+        ).fetchall()
+
+        prs: Dict[int, List[Dict]] = {}
+        ids = [row[0] for row in rows]
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            for entry, number, url, repo in self.db.execute(
+                f"SELECT entry, number, url, repo FROM entry_prs WHERE entry IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ):
+                pr = {"number": number, "url": url}
+                if repo:
+                    pr["repo"] = repo
+                prs.setdefault(entry, []).append(pr)
+
+        floor = version_key(since) if since else None
+        found = [
+            {"release": release, "category": category, "key": key, "note": note,
+             "prs": sorted(prs.get(entry_id, []), key=lambda p: (p.get("repo", ""), p["number"]))}
+            for entry_id, release, position, category, key, note in
+            sorted(rows, key=lambda r: (version_key(r[1]), r[2]))
+            if floor is None or version_key(release) > floor
+        ]
+        return found
+
+
+def write_changelog_index(path: str, releases: List[str], directory: str) -> int:
+    """Rewrite the list under `## Releases` in `path` to link each release's
+    file in `directory`, newest first. Returns how many it lists.
+
+    A release with no file there is left out rather than linked dead.
+    """
+    with open(path) as f:
+        lines = f.read().split("\n")
+    try:
+        heading = lines.index("## Releases")
+    except ValueError:
+        raise ReleaseNotesError(f"{path} has no '## Releases' heading")
+    start = heading + 1
+    while start < len(lines) and not lines[start].strip():
+        start += 1
+    end = start
+    while end < len(lines) and lines[end].startswith("- "):
+        end += 1
+
+    link_dir = os.path.relpath(directory, os.path.dirname(os.path.abspath(path)))
+    listed = [
+        f"- [{release}](./{link_dir}/{release}.md)"
+        for release in releases
+        if os.path.exists(os.path.join(directory, f"{release}.md"))
+    ]
+    lines[heading + 1:end] = ["", *listed]
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+    return len(listed)
+
+
+# Where `--artifacts-dir` remembers what it hashed, inside that directory.
+DIGEST_CACHE = ".release-notes-digests.json"
+
+
+def hash_artifact(path: str) -> str:
+    """The SHA-512 of a file, read a megabyte at a time into one buffer."""
+    digest = hashlib.sha512()
+    buffer = bytearray(1 << 20)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def human_size(size: int) -> str:
+    """A size the way `du -h` prints it — rounded up, one decimal under ten —
+    with the B the table has always had.
+    """
+    value, unit = float(size), ""
+    for unit in ["", "K", "M", "G", "T"]:
+        if value < 1024:
+            break
+        value /= 1024
+    if unit and value < 10:
+        return f"{math.ceil(value * 10) / 10:.1f}{unit}B"
+    return f"{math.ceil(value)}{unit}B"
+
+
+def artifact_digests(directory: str, pattern: str = "*") -> List[Dict]:
+    """The Downloads table rows for the files in `directory` matching `pattern`.
+
+    Files are hashed in parallel, one process each up to the CPU count, so a
+    set of large binaries costs about what reading them costs. Digests are
+    kept in DIGEST_CACHE by name, size and mtime; a rerun over unchanged files
+    hashes nothing.
+    """
+    cache_path = os.path.join(directory, DIGEST_CACHE)
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    files = {}
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if entry.name.startswith(".") or not entry.is_file() or not fnmatch.fnmatch(entry.name, pattern):
+            continue
+        st = entry.stat()
+        files[entry.name] = (entry.path, st.st_size, st.st_mtime_ns)
+
+    stale = [
+        name for name, (_, size, mtime) in files.items()
+        if (cache.get(name) or {}).get("stamp") != [size, mtime]
+    ]
+    if stale:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(len(stale), os.cpu_count() or 1)) as pool:
+            for name, sha512 in zip(stale, pool.map(hash_artifact, [files[n][0] for n in stale])):
+                cache[name] = {"stamp": list(files[name][1:]), "sha512": sha512}
+        with open(cache_path, "w") as f:
+            json.dump({name: cache[name] for name in files}, f, indent=2)
+    print(f"Hashed {len(stale)} of {len(files)} artifacts in {directory}")
+
+    return [
+        {"filename": name, "sha512": cache[name]["sha512"], "size": human_size(size)}
+        for name, (_, size, _) in files.items()
+    ]
 
 
 class ReleaseNotes:
     """Reads release notes off GitHub PRs."""
 
-    def __init__(self, repo: str, token: Optional[str] = None):
+    def __init__(
+        self,
+        repo: str,
+        token: Optional[str] = None,
+        cache: Optional[PRCache] = None,
+        transport: Optional[HTTPTransport] = None,
+        tracer: Optional[Tracer] = None,
+        rules_path: str = DEFAULT_RULES,
+        workdir: Optional[str] = None,
+        http: Optional[RequestScheduler] = None,
+    ):
         self.repo = repo
+        # The clone git runs in; the current directory when None.
+        self.workdir = workdir
+        self.rules_path = rules_path
+        self._rules: Optional[CategoryRules] = None
+        # Print which rule filed each note as `group_records` categorizes it.
+        self.explain = False
+        # Notes to compare against for key suggestions; None to suggest none.
+        self.similar: Optional[NoteIndex] = None
+        # Where merged PRs' notes are read before asking the API; None to
+        # always ask.
+        self.git_notes: Optional[GitNotes] = None
+        self.tracer = tracer or Tracer()
+        self.cache = cache
         self.token = token or os.getenv("GITHUB_TOKEN")
         self.owner, self.name = repo.split("/")
-        self.session = requests.Session()
-        if self.token:
-            self.session.headers.update({"Authorization": f"token {self.token}"})
-        self.base_url = "https://api.github.com"
+        if http is not None:
+            # Another repository's scheduler: one connection pool and one
+            # rate-limit budget across all of them.
+            self.session, self.http = http.session, http
+        else:
+            self.session = Session(transport)
+            if self.token:
+                self.session.headers.update({"Authorization": f"token {self.token}"})
+            self.http = RequestScheduler(self.session, tracer=self.tracer)
+        # Actions sets both, so a GitHub Enterprise server — or the benchmarks'
+        # local stand-in — works unchanged.
+        self.base_url = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+        self.graphql_url = os.getenv("GITHUB_GRAPHQL_URL", f"{self.base_url}/graphql")
 
     # ── validate ─────────────────────────────────────────────────────────────
 
@@ -103,13 +1775,44 @@ class ReleaseNotes:
         """Classify a PR body's release note as (state, message).
 
         State is one of `valid`, `none`, `invalid` and maps to the label of the
-        same name.
+        same name. A PR with several user-facing changes may write a block for
+        each; every block must pass, and NONE only stands alone.
         """
-        parsed = parse_release_note(body)
-        if parsed is None:
+        blocks = scan_release_notes(body)
+        if not blocks:
+            if len(body) > NOTE_SCAN_CHARS:
+                return "invalid", (
+                    f"No ```release-note``` block in the first {NOTE_SCAN_CHARS} "
+                    "characters of the description — move it above any pasted logs."
+                )
             return "invalid", "No ```release-note``` block found."
 
-        text, key = parsed["text"], parsed["key"]
+        results = [self._classify_block(block) for block in blocks]
+        if len(results) == 1:
+            return results[0]
+        for block, (state, message) in zip(blocks, results):
+            if state == "invalid":
+                return state, f"Block on line {block.line}: {message}"
+        states = {state for state, _ in results}
+        if states == {"none"}:
+            return "none", "NONE — no user-facing change."
+        if "none" in states:
+            lines = ", ".join(str(b.line) for b, (st, _) in zip(blocks, results) if st == "none")
+            return "invalid", (
+                f"NONE on line {lines} contradicts the other release-note blocks — "
+                "remove it, or make every block NONE."
+            )
+        return "valid", " | ".join(message for _, message in results)
+
+    @staticmethod
+    def _classify_block(block: NoteBlock) -> Tuple[str, str]:
+        """`classify` for one block."""
+        if not block.closed:
+            return "invalid", (
+                f"The release-note block opened on line {block.line} is never closed "
+                "with ```."
+            )
+        text, key = block.text, block.key
 
         if not text:
             return "invalid", "The release-note block is empty. Write a sentence, or NONE."
@@ -128,36 +1831,256 @@ class ReleaseNotes:
 
         return "valid", f"{text}" + (f"  [key={key}]" if key else "")
 
-    def validate_pr(self, number: int, apply_labels: bool = True) -> bool:
-        """Label a PR by the state of its release note. True when acceptable."""
-        resp = self.session.get(f"{self.base_url}/repos/{self.repo}/pulls/{number}")
-        resp.raise_for_status()
-        pr = resp.json()
-
-        state, message = self.classify(pr.get("body") or "")
+    def validate_pr(
+        self,
+        number: int,
+        apply_labels: bool = True,
+        event: Optional[Dict] = None,
+        record_note: bool = False,
+    ) -> bool:
+        """Label a PR by the state of its release note. True when acceptable.
+
+        `event` is the `pull_request` webhook payload, when there is one. It
+        already carries the body and labels, so no GET is needed; and on an
+        `edited` event it carries the previous body, so an edit that left the
+        block alone — the title, the rest of the description — writes nothing.
+
+        With `record_note`, a merged PR's parsed notes and labels are also
+        written to its merge commit under `git_notes` and pushed.
+        """
+        with self.tracer.span("release_notes.fetch", pr=number) as span:
+            pr = event_pr(event, number)
+            span["source"] = "event" if pr is not None else "api"
+            if pr is None:
+                pr = self.fetch_pr(number)
+
+        body = pr.get("body") or ""
+        with self.tracer.span("release_notes.parse", pr=number) as span:
+            state, message = self.classify(body)
+            span["state"] = state
         print(f"PR #{number}: {state} — {message}")
+        if self.similar is not None and state == "valid":
+            self._suggest_for(number, body)
 
         if apply_labels:
-            self._set_label(number, LABELS[state], [pr_label.get("name", "") for pr_label in pr.get("labels", [])])
-            if state == "invalid":
-                self._comment(number, message)
+            with self.tracer.span("release_notes.write", pr=number):
+                current = [pr_label.get("name", "") for pr_label in pr.get("labels", [])]
+                self._set_labels(number, LABELS[state], current)
+                self._sticky_comment(
+                    number, state, message, block_digest(body),
+                    was_invalid=LABELS["invalid"] in current,
+                    unchanged=block_unchanged(event, body),
+                )
+
+        if record_note:
+            sha = pr.get("merge_commit_sha")
+            if not pr.get("merged_at") or not sha:
+                raise ReleaseNotesError(f"PR #{number} is not merged; no commit to note")
+            with self.tracer.span("release_notes.record", pr=number):
+                self.git_notes.publish(sha, NoteRecord.from_pr(pr))
+            print(f"PR #{number}: notes recorded on {sha[:12]} under {self.git_notes.ref}")
 
         return state != "invalid"
 
-    def _set_label(self, number: int, wanted: str, current: List[str]) -> None:
+    def _suggest_for(self, number: int, body: str) -> None:
+        """Report indexed notes close to this PR's unkeyed notes."""
+        for parsed in parse_release_notes(body):
+            if parsed["key"]:
+                continue
+            matches = [
+                (i, score) for i, score in self.similar.query(parsed["text"])
+                if self.similar.items[i]["ref"] != f"#{number}"
+            ]
+            if not matches:
+                continue
+            slug = self.similar.slug([i for i, _ in matches])
+            print(f"  {parsed['text'][:60]!r} resembles — consider key={slug}:")
+            for i, score in matches[:5]:
+                item = self.similar.items[i]
+                print(f"    {score:.2f} {item['ref']:<8} {item['text'][:70]}")
+
+    def list_pages(self, url: str, params: Dict) -> Iterator[List[Dict]]:
+        """The pages of a REST listing, in order.
+
+        The first is fetched alone: its `Link: rel="last"` says how many there
+        are, and the rest are fetched concurrently, a pool's width ahead of the
+        caller, never past the last. A caller that has what it needs stops
+        iterating, and no more are asked for.
+        """
+        resp = self.http.get(url, params={**params, "per_page": 100, "page": 1})
+        resp.raise_for_status()
+        yield resp.json()
+        match = LINK_LAST_RE.search(resp.headers.get("Link") or "")
+        if not match:
+            return
+
+        def fetch_page(page: int) -> List[Dict]:
+            resp = self.http.get(url, params={**params, "per_page": 100, "page": page})
+            resp.raise_for_status()
+            return resp.json()
+
+        yield from self.http.imap(fetch_page, range(2, int(match.group(1)) + 1))
+
+    def open_prs(self, since: Optional[str] = None) -> List[Dict]:
+        """Open PRs, most recently updated first, optionally only those updated
+        on or after `since` (an ISO date); with `since`, paging stops at the
+        first page reaching back past it.
+        """
+        url = f"{self.base_url}/repos/{self.repo}/pulls"
+        prs: List[Dict] = []
+        for batch in self.list_pages(url, {"state": "open", "sort": "updated", "direction": "desc"}):
+            prs.extend(
+                project_pr(pr) for pr in batch
+                if not since or (pr.get("updated_at") or "") >= since
+            )
+            if since and batch and (batch[-1].get("updated_at") or "") < since:
+                break
+        return prs
+
+    def sweep(self, since: Optional[str] = None, dry_run: bool = False) -> List[Dict]:
+        """Re-validate every open PR against the current rules.
+
+        Bodies are classified locally from one bulk listing; only PRs whose
+        `release-note*` label would change are written to, concurrently. The
+        way to re-label after `classify`'s rules change, without pushing to
+        every PR. Returns the changes, made or — with `dry_run` — proposed.
+        """
+        with self.tracer.span("release_notes.fetch") as span:
+            prs = self.open_prs(since)
+            span["prs"] = len(prs)
+
+        changes = []
+        with self.tracer.span("release_notes.parse", prs=len(prs)):
+            for pr in prs:
+                state, message = self.classify(pr.get("body") or "")
+                current = [lbl.get("name", "") for lbl in pr.get("labels", [])]
+                had = [name for name in current if name in LABELS.values()]
+                if had == [LABELS[state]]:
+                    continue
+                changes.append({
+                    "number": pr["number"], "state": state, "message": message,
+                    "labels": current, "from": had, "to": LABELS[state],
+                    "body": pr.get("body") or "",
+                })
+
+        for change in changes:
+            print(
+                f"#{change['number']}: {', '.join(change['from']) or '(none)'} -> {change['to']}"
+                f"  — {change['message']}"
+            )
+        if dry_run or not changes:
+            return changes
+
+        def apply(change: Dict) -> None:
+            self._set_labels(change["number"], change["to"], change["labels"])
+            self._sticky_comment(
+                change["number"], change["state"], change["message"],
+                block_digest(change["body"]),
+                was_invalid=LABELS["invalid"] in change["labels"], unchanged=False,
+            )
+
+        with self.tracer.span("release_notes.write", prs=len(changes)):
+            self.http.map(apply, changes)
+        return changes
+
+    def fetch_pr(self, number: int) -> Dict:
+        """One PR, revalidated against the cache with `If-None-Match`.
+
+        A 304 costs nothing against the rate limit and answers from the cached
+        row.
+        """
+        cached = self.cache.get(self.repo, number) if self.cache else None
+        headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else {}
+        resp = self.http.get(f"{self.base_url}/repos/{self.repo}/pulls/{number}", headers=headers)
+        if resp.status_code == 304 and cached:
+            self.tracer.count("cache.hits")
+            self.cache.touch(self.repo, [number])
+            return cached["pr"]
+        resp.raise_for_status()
+        full = resp.json()
+        pr = project_pr(full)
+        if self.cache:
+            self.tracer.count("cache.misses")
+            self.cache.put(self.repo, pr, full.get("updated_at"), resp.headers.get("ETag"))
+        return pr
+
+    def _set_labels(self, number: int, wanted: str, current: List[str]) -> None:
+        """Swap the `release-note*` label for `wanted`: usually one request,
+        none when it is already set.
+
+        Only `release-note*` labels are written. `current` comes from an event
+        payload or a listing that may be minutes old, and writing the whole
+        set from it would drop any label added since, `type/*` included.
+        """
+        labels_url = f"{self.base_url}/repos/{self.repo}/issues/{number}/labels"
+        if wanted not in current:
+            self.http.post(labels_url, json={"labels": [wanted]}).raise_for_status()
         for stale in LABELS.values():
             if stale != wanted and stale in current:
-                self.session.delete(
-                    f"{self.base_url}/repos/{self.repo}/issues/{number}/labels/{stale}"
-                )
-        if wanted not in current:
-            self.session.post(
-                f"{self.base_url}/repos/{self.repo}/issues/{number}/labels",
-                json={"labels": [wanted]},
-            )
+                resp = self.http.delete(f"{labels_url}/{urllib.parse.quote(stale, safe='')}")
+                # 404: it was removed since `current` was read.
+                if resp.status_code != 404:
+                    resp.raise_for_status()
+
+    def _sticky_comment(
+        self,
+        number: int,
+        state: str,
+        reason: str,
+        digest: str,
+        was_invalid: bool,
+        unchanged: bool,
+    ) -> None:
+        """Keep one bot comment per PR, edited in place as the note changes.
+
+        It is written when the note fails and rewritten once it passes. Its
+        hidden marker records the digest of the block it was written for, so
+        a re-run over the same block leaves it alone. When the event shows the
+        block unchanged since a run that already labelled it invalid, that run
+        wrote the comment, and there is nothing to read or write.
+        """
+        if state != "invalid" and not was_invalid:
+            return
+        if state == "invalid" and was_invalid and unchanged:
+            return
+
+        existing = self._find_sticky(number)
+        if existing is None and state != "invalid":
+            return
+        if existing is not None and f"digest={digest} " in existing["body"].split("\n", 1)[0]:
+            return
+
+        body = f"{STICKY_MARKER} digest={digest} -->\n" + self._comment_body(state, reason)
+        if existing is None:
+            self.http.post(
+                f"{self.base_url}/repos/{self.repo}/issues/{number}/comments",
+                json={"body": body},
+            ).raise_for_status()
+        else:
+            self.http.patch(
+                f"{self.base_url}/repos/{self.repo}/issues/comments/{existing['id']}",
+                json={"body": body},
+            ).raise_for_status()
+
+    def _find_sticky(self, number: int) -> Optional[Dict]:
+        url = f"{self.base_url}/repos/{self.repo}/issues/{number}/comments"
+        page = 1
+        while True:
+            resp = self.http.get(url, params={"per_page": 100, "page": page})
+            resp.raise_for_status()
+            comments = resp.json()
+            for comment in comments:
+                if (comment.get("body") or "").startswith(STICKY_MARKER):
+                    return comment
+            if len(comments) < 100:
+                return None
+            page += 1
 
-    def _comment(self, number: int, reason: str) -> None:
-        body = "\n".join([
+    @staticmethod
+    def _comment_body(state: str, reason: str) -> str:
+        if state != "invalid":
+            return "\n".join(["## Release note check passed", "", reason])
+        return "\n".join([
             "## Release note check failed",
             "",
             reason,
@@ -177,137 +2100,393 @@ class ReleaseNotes:
             "",
             "See `.github/RELEASE_NOTES.md` for the full guidelines.",
         ])
-        self.session.post(
-            f"{self.base_url}/repos/{self.repo}/issues/{number}/comments",
-            json={"body": body},
-        )
 
     # ── aggregate ────────────────────────────────────────────────────────────
 
     def pr_numbers_in_range(self, from_ref: str, to_ref: str) -> Optional[List[int]]:
-        """PR numbers merged in `from_ref..to_ref`, oldest first, from git log.
+        """PR numbers merged in `from_ref..to_ref`, oldest first, from git log."""
+        merges = self.merges_in_range(from_ref, to_ref)
+        return None if merges is None else [m.number for m in merges]
+
+    def merges_in_range(self, from_ref: str, to_ref: str) -> Optional[List[MergeCommit]]:
+        """PRs merged in `from_ref..to_ref`, oldest first, with their commits.
 
         Returns None when the range cannot be resolved (shallow clone, missing
         tag), which the caller treats as fatal rather than falling back to
         "every PR in the repo" — that fallback silently re-emits the previous
         release's entire changelog.
         """
+        # Subjects only: bodies are excluded, see SQUASH_SUBJECT_RE. %ct, not
+        # %cI: git formats a date for every commit walked, and that is most
+        # of the difference between this walk and `--format=%s`. `--grep`
+        # would have git drop the other commits, but it searches every line
+        # of every message and costs git more than it saves here.
+        records = git_log_records(
+            ["--format=%H%x1f%ct%x1f%s", f"{from_ref}..{to_ref}"], 3, cwd=self.workdir
+        )
+        merges: List[MergeCommit] = []
+        seen = set()
         try:
-            out = subprocess.run(
-                ["git", "log", "--format=%s", f"{from_ref}..{to_ref}"],
-                capture_output=True, text=True, check=True,
-            ).stdout
+            with self.tracer.span("release_notes.git_walk", range=f"{from_ref}..{to_ref}") as span:
+                for merge in merge_commits(records):
+                    if merge.number not in seen:
+                        seen.add(merge.number)
+                        merges.append(merge)
+                span["prs"] = len(merges)
         except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            print(f"Error: cannot resolve range {from_ref}..{to_ref}: {e}")
+            detail = (getattr(e, "stderr", None) or str(e)).strip()
+            print(f"Error: cannot resolve range {from_ref}..{to_ref}: {detail}")
             return None
 
-        # Subject lines only, in the two forms a merge actually produces:
-        # squash ("Some title (#12)") and merge commit ("Merge pull request
-        # #12 from ..."). Bodies are excluded and both patterns are anchored,
-        # because an unanchored "#(\d+)" over full commit messages matches card
-        # ids, issue references and anything else shaped like one.
-        numbers: List[int] = []
-        seen = set()
-        for subject in out.splitlines():
-            match = re.search(r"\(#(\d+)\)\s*$", subject) or re.match(
-                r"^Merge pull request #(\d+)\b", subject
-            )
-            if match:
-                number = int(match.group(1))
-                if number not in seen:
-                    seen.add(number)
-                    numbers.append(number)
-
         # git log is newest-first; the merge order is what "last one wins"
         # means when several PRs share a grouping key.
-        numbers.reverse()
-        return numbers
+        merges.reverse()
+        return merges
+
+    def merges_by_release(
+        self, tags: List[str], base: Optional[str] = None
+    ) -> Optional[Dict[str, List[MergeCommit]]]:
+        """PRs merged in each release, oldest first, from a single git walk.
+
+        `tags` are in release order; a release holds what its tag reaches and
+        no earlier tag does, so the first holds everything back to `base` (or
+        the root). One `git log` over all tags yields the commit graph, and each
+        commit is assigned to the first tag that reaches it — a walk from each
+        tag in turn that stops at commits an earlier tag already claimed. That
+        is one pass over history however many releases there are, where running
+        `merges_in_range` per pair would walk the shared history once per
+        release.
+        """
+        try:
+            with self.tracer.span("release_notes.git_walk", tags=len(tags)):
+                heads, graph = self._release_graph(tags, base)
+                return self._split_releases(tags, heads, graph)
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            detail = (getattr(e, "stderr", None) or str(e)).strip()
+            print(f"Error: cannot resolve tags {', '.join(tags)}: {detail}")
+            return None
 
-    def get_prs_between(self, from_ref: str, to_ref: str) -> List[Dict]:
-        """Merged PRs whose merge commit is in `from_ref..to_ref`, oldest first."""
-        in_range = self.pr_numbers_in_range(from_ref, to_ref)
-        if in_range is None:
-            return []
-        if not in_range:
+    def _release_graph(self, tags: List[str], base: Optional[str]) -> Tuple[List[str], Dict]:
+        """Each tag's commit, and sha -> (parents, committed, subject) for the history
+        they reach; dict order is git log order, newest first."""
+        heads = subprocess.run(
+            ["git", "rev-parse", *(f"{tag}^{{commit}}" for tag in tags)],
+            capture_output=True, text=True, check=True, cwd=self.workdir,
+        ).stdout.split()
+        records = git_log_records(
+            ["--format=%H%x1f%P%x1f%ct%x1f%s", *tags, *([f"^{base}"] if base else [])], 4,
+            cwd=self.workdir,
+        )
+        graph = {
+            sha: (parents.split(), committed, subject)
+            for sha, parents, committed, subject in records
+        }
+        return heads, graph
+
+    @staticmethod
+    def _split_releases(
+        tags: List[str], heads: List[str], graph: Dict
+    ) -> Dict[str, List[MergeCommit]]:
+        release_of: Dict[str, str] = {}
+        for tag, head in zip(tags, heads):
+            if head in release_of:
+                # An -rc and its final on one commit: the final is empty.
+                print(f"Warning: {tag} adds nothing to {release_of[head]}, "
+                      f"which already reaches its commit; its release is empty")
+                continue
+            stack = [head]
+            while stack:
+                sha = stack.pop()
+                if sha in release_of or sha not in graph:
+                    continue
+                release_of[sha] = tag
+                stack.extend(graph[sha][0])
+
+        records_of: Dict[str, List[List[str]]] = {tag: [] for tag in tags}
+        for sha, (_, committed, subject) in graph.items():
+            if sha in release_of:
+                records_of[release_of[sha]].append([sha, committed, subject])
+
+        releases: Dict[str, List[MergeCommit]] = {}
+        for tag in tags:
+            merges: List[MergeCommit] = []
+            seen = set()
+            for merge in merge_commits(records_of[tag]):
+                if merge.number not in seen:
+                    seen.add(merge.number)
+                    merges.append(merge)
+            merges.reverse()
+            releases[tag] = merges
+        return releases
+
+    def tag_dates(self, tags: List[str]) -> Dict[str, str]:
+        """Each tag's commit date, YYYY-MM-DD — the release date a tag records.
+
+        Keyed through the commit: `git log --no-walk` prints a commit once
+        however many of `tags` point at it.
+        """
+        heads = subprocess.run(
+            ["git", "rev-parse", *(f"{tag}^{{commit}}" for tag in tags)],
+            capture_output=True, text=True, check=True, cwd=self.workdir,
+        ).stdout.split()
+        out = subprocess.run(
+            ["git", "log", "--no-walk=unsorted", "--format=%H %cs", *set(heads)],
+            capture_output=True, text=True, check=True, cwd=self.workdir,
+        ).stdout
+        dates = dict(line.split() for line in out.splitlines())
+        return {tag: dates[head] for tag, head in zip(tags, heads)}
+
+    def get_prs_between(self, from_ref: str, to_ref: str) -> List[NoteRecord]:
+        """Merged PRs whose merge commit is in `from_ref..to_ref`, oldest first.
+
+        Raises `ReleaseNotesError` when the range can't be resolved and lets a
+        failed fetch raise: either way the changelog would be missing PRs, and
+        an empty or short one looks exactly like a quiet release.
+        """
+        merges = self.merges_in_range(from_ref, to_ref)
+        if merges is None:
+            raise ReleaseNotesError(f"cannot resolve range {from_ref}..{to_ref}")
+        if not merges:
             print(f"No PRs found in {from_ref}..{to_ref}")
             return []
+        return self.merged_prs(merges, self.records_for(merges))
 
-        wanted = set(in_range)
-        url = f"{self.base_url}/repos/{self.repo}/pulls"
-        params = {"state": "closed", "per_page": 100}
-        found: Dict[int, Dict] = {}
-        page = 1
+    def records_for(self, merges: List[MergeCommit], repo: Optional[str] = None) -> Dict[int, NoteRecord]:
+        """A record for each merge by PR number: from the merge commit's git
+        note where it has one, from the API for the rest.
 
+        A range whose merges are all noted makes no request at all, and needs
+        neither a token nor a network. `repo` prefixes the progress line when
+        several repositories report at once.
+        """
+        found: Dict[int, NoteRecord] = {}
+        if self.git_notes:
+            with self.tracer.span("release_notes.git_notes", merges=len(merges)) as span:
+                noted = self.git_notes.read(m.sha for m in merges)
+                for merge in merges:
+                    if merge.sha in noted:
+                        found[merge.number] = noted[merge.sha]
+                span["found"] = len(found)
+            if found:
+                read = f"{len(found)} PRs from {self.git_notes.ref}"
+                # One write per line: other repositories' threads print too.
+                print(f"{repo}: read {read}\n" if repo else f"Read {read}\n", end="")
+        missing = list({m.number: None for m in merges if m.number not in found})
+        if missing:
+            found.update(self.fetch_prs(missing))
+        return found
+
+    def unreleased_records(self) -> List[NoteRecord]:
+        """The noted PRs merged since the last `v*` tag, in merge order.
+
+        Read from git notes alone, never the API: empty in a clone without
+        tags or without the notes ref fetched.
+        """
         try:
-            while True:
-                params["page"] = page
-                resp = self.session.get(url, params=params)
-                resp.raise_for_status()
-                prs = resp.json()
-
-                if not prs:
-                    break
-
-                for pr in prs:
-                    if pr.get("merged_at") and pr["number"] in wanted:
-                        found[pr["number"]] = pr
-
-                # Every in-range PR is accounted for; no need to page further
-                # back through the repo's history.
-                if len(found) >= len(wanted):
-                    break
-
-                page += 1
-                # Safety limit: stop after 10 pages (1000 PRs)
-                if page > 10:
-                    break
-
-        except requests.RequestException as e:
-            print(f"Error fetching PRs: {e}")
+            tag = subprocess.run(
+                ["git", "describe", "--tags", "--abbrev=0", "--match", "v*", "HEAD"],
+                capture_output=True, text=True, check=True, cwd=self.workdir,
+            ).stdout.strip()
+        except (subprocess.CalledProcessError, FileNotFoundError):
             return []
+        merges = self.merges_in_range(tag, "HEAD") or []
+        noted = GitNotes(cwd=self.workdir).read(m.sha for m in merges)
+        return [noted[m.sha] for m in merges if m.sha in noted]
+
+    @property
+    def route(self) -> str:
+        """How merged PRs are fetched: "graphql" with a token, "rest" without;
+        replaying, whichever the cassette was recorded with.
+        """
+        recorded = getattr(self.session.transport, "route", None)
+        return recorded or ("graphql" if self.token else "rest")
 
-        return [found[n] for n in in_range if n in found]
-
-    # A card's `type/*` label is carried onto its PR by barkfactory, so the
-    # category is recorded data rather than something to infer from wording.
-    LABEL_CATEGORIES = {
-        "type/feature": "Features",
-        "type/bug": "Bug Fixes",
-        "type/refactor": "Other",
-        "type/cleanup": "Other",
-        "type/docs": "Other",
-        "type/question": "Other",
-    }
+    def fetch_prs(self, numbers: List[int]) -> Dict[int, NoteRecord]:
+        """Merged PRs by number, by `route`.
 
-    def categorize_note(self, note: str, labels: Optional[List[str]] = None) -> str:
-        """Categorize a release note.
+        Each PR is parsed into its `NoteRecord` as the response carrying it
+        arrives; nothing keeps the payload past that.
+        """
+        with self.tracer.span("release_notes.fetch", prs=len(numbers)) as span:
+            if self.route == "graphql":
+                found = self.fetch_prs_graphql(numbers)
+            else:
+                found = self.fetch_prs_paging(numbers)
+            span["found"] = len(found)
 
-        `Breaking:` wins outright and lands in Other, where `generate_markdown`
-        floats it to the top of the section. Murmur is pre-1.0, so breaking
-        changes are routine rather than exceptional and don't warrant a section
-        of their own — but a reader scanning for what an upgrade costs must not
-        find one filed under Features because the sentence also says "add".
+        missing = [n for n in numbers if n not in found]
+        if missing:
+            print(f"Warning: no merged PR found for {', '.join(f'#{n}' for n in missing)}")
+        return found
 
-        Otherwise the PR's `type/*` label decides. The keyword heuristic below
-        is the fallback for a PR carrying no such label — it guesses from
-        wording, which is why "Capsules can now declare CPU, memory, process
-        and disk limits" once landed in Other.
+    @staticmethod
+    def merged_prs(
+        merges: List[MergeCommit], found: Dict[int, NoteRecord], seq: int = 0
+    ) -> List[NoteRecord]:
+        """The fetched PR for each merge, in merge order, numbered from `seq`."""
+        records = []
+        for merge in merges:
+            if merge.number in found:
+                record = found[merge.number]
+                record.seq = seq + len(records)
+                records.append(record)
+        return records
+
+    # Only what `aggregate` reads. A full REST PR object carries the head and
+    # base repositories and every link besides; this is a few hundred bytes.
+    GRAPHQL_PR_FIELDS = """
+        number
+        title
+        body
+        url
+        mergedAt
+        updatedAt
+        author { login }
+        labels(first: 100) { nodes { name } }
+    """
+    GRAPHQL_BATCH = 100
+
+    def fetch_prs_graphql(self, numbers: List[int]) -> Dict[int, NoteRecord]:
+        """Merged PRs by number, up to `GRAPHQL_BATCH` per request.
+
+        Each PR is an aliased `pullRequest(number:)` lookup, so the cost is the
+        number of PRs in the range, not the depth of the repo's history — which
+        paging `/pulls` back to the oldest in-range PR was. Needs a token: the
+        GraphQL API has no anonymous access.
+
+        A cached PR is asked only for its `updatedAt`, in the same request as
+        the uncached ones; those that moved are fetched whole in a second
+        round. Regenerating a changelog after one note was edited is two
+        requests.
         """
-        lower = note.lower()
+        cached = self.cache.get_many(self.repo, numbers) if self.cache else {}
+        found: Dict[int, NoteRecord] = {}
+        stale: List[int] = []
+
+        for node in self._graphql_lookup(numbers, stamp_only=set(cached)):
+            number = node["number"]
+            row = cached.get(number)
+            if row and "body" not in node:
+                if node.get("updatedAt") == row["updated_at"]:
+                    self.tracer.count("cache.hits")
+                    found[number] = NoteRecord.from_pr(row["pr"])
+                else:
+                    stale.append(number)
+                continue
+            self._take_graphql(node, found)
 
-        if lower.startswith("breaking:"):
-            return "Other"
+        for node in self._graphql_lookup(stale, stamp_only=set()):
+            self._take_graphql(node, found)
 
-        for label in labels or []:
-            if label in self.LABEL_CATEGORIES:
-                return self.LABEL_CATEGORIES[label]
+        if self.cache:
+            self.cache.touch(self.repo, list(found))
+        return found
 
-        if any(w in lower for w in ["fix", "fixed", "resolve", "resolved"]):
-            return "Bug Fixes"
-        if any(w in lower for w in ["add", "added", "new", "feature", "implement"]):
-            return "Features"
+    def _graphql_lookup(self, numbers: List[int], stamp_only: set):
+        """Yield the PR node for each number that resolves.
 
-        return "Other"
+        Batches are requested concurrently and yielded as each comes in; nodes
+        are yielded on the calling thread, which is the one that owns the cache.
+        """
+        batches = [
+            numbers[start:start + self.GRAPHQL_BATCH]
+            for start in range(0, len(numbers), self.GRAPHQL_BATCH)
+        ]
+        for data in self.http.imap(lambda batch: self._graphql_batch(batch, stamp_only), batches):
+            for node in (data.get("repository") or {}).values():
+                if node:
+                    yield node
+
+    def _graphql_batch(self, batch: List[int], stamp_only: set) -> Dict:
+        lookups = "\n".join(
+            f"pr{n}: pullRequest(number: {n}) {{ ...{'stamp' if n in stamp_only else 'pr'} }}"
+            for n in batch
+        )
+        fragments = []
+        if any(n not in stamp_only for n in batch):
+            fragments.append(f"fragment pr on PullRequest {{{self.GRAPHQL_PR_FIELDS}}}")
+        if any(n in stamp_only for n in batch):
+            fragments.append("fragment stamp on PullRequest { number updatedAt }")
+        query = (
+            "query($owner: String!, $name: String!) {\n"
+            f"  repository(owner: $owner, name: $name) {{\n{lookups}\n  }}\n"
+            "}\n" + "\n".join(fragments)
+        )
+        return self.graphql(query, {"owner": self.owner, "name": self.name})
+
+    def _take_graphql(self, node: Dict, found: Dict[int, NoteRecord]) -> None:
+        if not node.get("mergedAt"):
+            return
+        pr = self._pr_from_graphql(node)
+        found[pr["number"]] = NoteRecord.from_pr(pr)
+        if self.cache:
+            self.tracer.count("cache.misses")
+            self.cache.put(self.repo, pr, node.get("updatedAt"))
+
+    def graphql(self, query: str, variables: Dict) -> Dict:
+        """Run a GraphQL query and return its `data`.
+
+        A number in the range that is an issue rather than a PR comes back as a
+        NOT_FOUND error beside a null alias; that is an answer, not a failure.
+        Any other error is raised.
+        """
+        resp = self.http.post(
+            self.graphql_url, json={"query": query, "variables": variables}
+        )
+        resp.raise_for_status()
+        payload = resp.json()
+        errors = [e for e in payload.get("errors") or [] if e.get("type") != "NOT_FOUND"]
+        if errors:
+            raise RequestError(
+                "GraphQL: " + "; ".join(e.get("message", "unknown error") for e in errors)
+            )
+        return payload.get("data") or {}
+
+    @staticmethod
+    def _pr_from_graphql(node: Dict) -> Dict:
+        # The REST field names, so everything downstream reads one shape.
+        return project_pr({
+            "number": node["number"],
+            "title": node.get("title"),
+            "body": node.get("body"),
+            "html_url": node.get("url"),
+            "merged_at": node.get("mergedAt"),
+            "user": node.get("author"),
+            "labels": (node.get("labels") or {}).get("nodes"),
+        })
+
+    def fetch_prs_paging(self, numbers: List[int]) -> Dict[int, NoteRecord]:
+        """Merged PRs by number, paging back through closed PRs.
+
+        The fallback without a token. Paging stops once every wanted PR is seen
+        or the listing runs out — never at a fixed page count, which dropped the
+        older PRs of a range once the repo had more than 1000 closed.
+
+        The cache is written, not read: the listing carries each PR whole, so
+        the pages are the fetch, and whether a cached PR changed shows only in
+        the listing, as far down as the PR itself.
+        """
+        wanted = set(numbers)
+        url = f"{self.base_url}/repos/{self.repo}/pulls"
+        found: Dict[int, NoteRecord] = {}
+        for prs in self.list_pages(url, {"state": "closed"}):
+            for pr in prs:
+                if pr.get("merged_at") and pr["number"] in wanted:
+                    found[pr["number"]] = NoteRecord.from_pr(pr)
+                    if self.cache:
+                        self.cache.put(self.repo, project_pr(pr), pr.get("updated_at"))
+            # Every in-range PR is accounted for; no need to page further back
+            # through the repo's history.
+            if len(found) >= len(wanted):
+                break
+        return found
+
+    @property
+    def rules(self) -> CategoryRules:
+        """The category rules, read from `rules_path` on first use."""
+        if self._rules is None:
+            self._rules = CategoryRules.load(self.rules_path)
+        return self._rules
 
     @staticmethod
     def group_notes(notes: List[Dict]) -> List[Dict]:
@@ -325,8 +2504,14 @@ class ReleaseNotes:
         groups: Dict[str, Dict] = {}
         for note in notes:
             # An absent key can't collide: prefix keeps it out of the key
-            # namespace even if someone names a key after a PR number.
-            key = note["key"] or f"#{note['number']}"
+            # namespace even if someone names a key after a PR number, the
+            # repository keeps two repositories' PR #12 apart, and the block
+            # index keeps a PR's several notes apart. A key spans repositories.
+            repo = note.get("repo")
+            key = note["key"] or f"{repo or ''}#{note['number']}/{note.get('block', 0)}"
+            pr = {"number": note["number"], "url": note["url"]}
+            if repo:
+                pr["repo"] = repo
             group = groups.get(key)
             if group is None:
                 groups[key] = {
@@ -334,11 +2519,12 @@ class ReleaseNotes:
                     "note": note["note"],
                     "category": note["category"],
                     "seq": note["seq"],
-                    "prs": [{"number": note["number"], "url": note["url"]}],
+                    "prs": [pr],
                 }
                 continue
 
-            group["prs"].append({"number": note["number"], "url": note["url"]})
+            if all((p["number"], p.get("repo")) != (note["number"], repo) for p in group["prs"]):
+                group["prs"].append(pr)
             if note["seq"] > group["seq"]:
                 group["note"] = note["note"]
                 group["category"] = note["category"]
@@ -349,36 +2535,175 @@ class ReleaseNotes:
     def aggregate(self, from_ref: str, to_ref: str) -> Dict[str, List[Dict]]:
         """Aggregate release notes between two refs."""
         print(f"Fetching merged PRs between {from_ref} and {to_ref}...")
-        prs = self.get_prs_between(from_ref, to_ref)
-        print(f"Found {len(prs)} merged PRs")
+        records = self.get_prs_between(from_ref, to_ref)
+        print(f"Found {len(records)} merged PRs")
+        return self.group_records(records)
+
+    def aggregate_ranges(
+        self, ranges: List[RepoRange], cache: Optional[Callable[[], Optional[PRCache]]] = None
+    ) -> Dict[str, List[Dict]]:
+        """Aggregate one release spanning several repositories.
+
+        Each repository's clone is walked and its PRs fetched on a thread of
+        its own, all over this instance's scheduler: one connection pool and
+        one rate-limit budget, so the run takes about as long as its slowest
+        repository. Merges are then put in merge-time order across all of
+        them, and a `key=` groups notes whatever repository they came from.
+
+        `cache` opens a PR cache for a thread; a SQLite connection stays on
+        the thread that opened it.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if isinstance(self.session.transport, HTTPTransport):
+            # Each repository runs a window of `workers` requests of its own.
+            self.session.transport.maxsize = self.http.workers * len(ranges)
+
+        def walk(part: RepoRange, parent: str) -> List[Tuple[int, NoteRecord]]:
+            # `parent` is the span open on the calling thread: this one's
+            # spans, and its requests, belong under it and not under another
+            # repository's.
+            with self.tracer.attach(parent), self.tracer.span("release_notes.repo", repo=part.repo):
+                notes = ReleaseNotes(
+                    part.repo, token=self.token, cache=cache() if cache else None,
+                    tracer=self.tracer, rules_path=self.rules_path, workdir=part.path, http=self.http,
+                )
+                if self.git_notes:
+                    notes.git_notes = GitNotes(self.git_notes.ref, self.git_notes.remote, cwd=part.path)
+                # One write per line, or the threads' lines run together.
+                print(f"{part.repo}: fetching merged PRs between {part.from_ref} and {part.to_ref}...\n", end="")
+                merges = notes.merges_in_range(part.from_ref, part.to_ref)
+                if merges is None:
+                    raise ReleaseNotesError(
+                        f"{part.repo}: cannot resolve range {part.from_ref}..{part.to_ref}"
+                    )
+                found = notes.records_for(merges, part.repo) if merges else {}
+                merged = []
+                for merge in merges:
+                    if merge.number in found:
+                        found[merge.number].repo = part.repo
+                        merged.append((merge.committed, found[merge.number]))
+                print(f"{part.repo}: found {len(merged)} merged PRs\n", end="")
+                return merged
+
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            parents = [self.tracer.current()] * len(ranges)
+            merged = [m for part in pool.map(walk, ranges, parents) for m in part]
+        # Each repository's list is already in merge order; a stable sort on
+        # the merge time interleaves them.
+        merged.sort(key=lambda m: m[0])
+        records = []
+        for seq, (_, record) in enumerate(merged):
+            record.seq = seq
+            records.append(record)
+        return self.group_records(records)
+
+    def aggregate_releases(
+        self, tags: List[str], base: Optional[str] = None
+    ) -> Dict[str, Dict[str, List[Dict]]]:
+        """Aggregate release notes for every release in `tags`, keyed by tag.
+
+        One git walk splits the history into releases and every PR across all
+        of them is fetched in one go, so re-rendering the whole history costs
+        what the PRs cost, not releases times PRs.
+        """
+        print(f"Splitting history into {len(tags)} releases...")
+        releases = self.merges_by_release(tags, base)
+        if releases is None:
+            raise ReleaseNotesError(f"cannot resolve tags {', '.join(tags)}")
+
+        found = self.records_for([m for merges in releases.values() for m in merges])
+        print(f"Found {len(found)} merged PRs across {len(tags)} releases")
+
+        grouped = {}
+        seq = 0
+        for tag, merges in releases.items():
+            print(f"{tag}: ", end="")
+            records = self.merged_prs(merges, found, seq)
+            seq += len(records)
+            grouped[tag] = self.group_records(records)
+        return grouped
 
+    def group_records(self, records: List[NoteRecord]) -> Dict[str, List[Dict]]:
+        """Group `NoteRecord`s, from a fetch or from git notes, by category."""
         notes = []
-        for seq, pr in enumerate(prs):
-            parsed = parse_release_note(pr.get("body") or "")
-            if not parsed or not parsed["text"] or parsed["text"].upper() == "NONE":
+        with self.tracer.span("release_notes.categorize", records=len(records)):
+            rules = self.rules
+            for record in records:
+                for block, parsed in enumerate(record.notes):
+                    if not parsed.text or parsed.text.upper() == "NONE":
+                        continue
+                    filed = rules.categorize(parsed.text, record.labels)
+                    if self.explain:
+                        why = f"{filed.rule}: {filed.match}" if filed.rule else "default"
+                        print(f"  #{record.number:<6} {filed.category:<10} <- {why:<28} {parsed.text[:60]}")
+                    notes.append(
+                        {
+                            "repo": record.repo,
+                            "number": record.number,
+                            "block": block,
+                            "category": filed.category,
+                            "note": parsed.text,
+                            "key": parsed.key,
+                            "url": record.url,
+                            "seq": record.seq,
+                        }
+                    )
+
+        with self.tracer.span("release_notes.group", notes=len(notes)) as span:
+            entries = self.group_notes(notes)
+            grouped: Dict[str, List[Dict]] = {}
+            for entry in entries:
+                grouped.setdefault(entry["category"], []).append(entry)
+            span["entries"] = len(entries)
+        print(f"{len(notes)} notes -> {len(entries)} changelog entries")
+        if self.similar is not None:
+            self.suggest_keys(entries)
+
+        return grouped
+
+    def render_order(self, grouped_notes: Dict[str, List[Dict]]) -> Iterator[Tuple[str, List[Dict]]]:
+        """Each category with entries, and its entries, in the order they render."""
+        for category in self.rules.categories:
+            if category not in grouped_notes:
                 continue
-            labels = [lbl.get("name", "") for lbl in pr.get("labels", [])]
-            notes.append(
-                {
-                    "number": pr["number"],
-                    "title": pr.get("title"),
-                    "author": pr.get("user", {}).get("login"),
-                    "category": self.categorize_note(parsed["text"], labels),
-                    "note": parsed["text"],
-                    "key": parsed["key"],
-                    "url": pr.get("html_url"),
-                    "seq": seq,
-                }
+            # Breaking changes lead their section: they are the only entries a
+            # reader has to act on, and burying one mid-list is how an upgrade
+            # breaks in the field. Newest first below that.
+            yield category, sorted(
+                grouped_notes[category],
+                key=lambda n: (not n["note"].lower().startswith("breaking:"), -n["seq"]),
             )
 
-        entries = self.group_notes(notes)
-        print(f"{len(notes)} notes -> {len(entries)} changelog entries")
+    def suggest_keys(self, entries: List[Dict]) -> List[Dict]:
+        """Clusters of near-duplicate entries, with a key to group each by.
 
-        grouped: Dict[str, List[Dict]] = {}
+        Compares `entries` with each other and with whatever `similar` already
+        holds — past releases' notes, say. Printed, and returned as
+        `{key, notes: [{ref, text}]}`. `entries` count as past once reported,
+        so under `--all-tags` each release reports only clusters holding one
+        of its own notes, not the earlier releases' again.
+        """
         for entry in entries:
-            grouped.setdefault(entry["category"], []).append(entry)
-
-        return grouped
+            ref = ",".join(f"#{pr['number']}" for pr in entry["prs"])
+            self.similar.add(entry["note"], ref, entry["key"])
+
+        suggestions = []
+        for members in self.similar.clusters():
+            items = [self.similar.items[i] for i in members]
+            suggestions.append({
+                "key": self.similar.slug(members),
+                "notes": [{"ref": item["ref"], "text": item["text"]} for item in items],
+            })
+        for item in self.similar.items:
+            item["past"] = True
+
+        print(f"{len(suggestions)} clusters of similar notes")
+        for suggestion in suggestions:
+            print(f"  key={suggestion['key']}")
+            for note in suggestion["notes"]:
+                print(f"    {note['ref']:<10} {note['text'][:70]}")
+        return suggestions
 
     def generate_markdown(
         self,
@@ -390,23 +2715,37 @@ class ReleaseNotes:
         repo: str = None,
     ) -> str:
         """Generate markdown changelog from grouped notes."""
-        lines = []
+        return "\n".join(self.markdown_lines(
+            grouped_notes, version, date, binaries, previous_version, repo
+        ))
 
+    def markdown_lines(
+        self,
+        grouped_notes: Dict[str, List[Dict]],
+        version: str = None,
+        date: str = None,
+        binaries: List[Dict] = None,
+        previous_version: str = None,
+        repo: str = None,
+    ) -> Iterator[str]:
+        """The lines of `generate_markdown`, as they are produced."""
         if version:
             if not date:
+                from datetime import datetime
+
                 date = datetime.now().strftime("%Y-%m-%d")
 
             # Header with version and date
-            lines.append(f"# v{version}\n")
-            lines.append(f"> Published: {date}\n")
-            lines.append("[Murmur Documentation](https://docs.murmur.nexus)\n")
+            yield f"# v{version}\n"
+            yield f"> Published: {date}\n"
+            yield "[Murmur Documentation](https://docs.murmur.nexus)\n"
 
             # Binaries table
             if binaries:
-                lines.append(f"## Downloads for v{version}\n")
-                lines.append("")
-                lines.append("| filename | sha512 hash | size |")
-                lines.append("| --- | --- | --- |")
+                yield f"## Downloads for v{version}\n"
+                yield ""
+                yield "| filename | sha512 hash | size |"
+                yield "| --- | --- | --- |"
                 for binary in binaries:
                     filename = binary['filename']
                     sha512 = binary['sha512']
@@ -417,107 +2756,614 @@ class ReleaseNotes:
                         filename_link = f"[{filename}]({download_url})"
                     else:
                         filename_link = filename
-                    lines.append(f"| {filename_link} | `{sha512}` | {size} |")
-                lines.append("")
+                    yield f"| {filename_link} | `{sha512}` | {size} |"
+                yield ""
 
             # Changes header
             if previous_version:
-                lines.append(f"## Changes since v{previous_version}\n")
+                yield f"## Changes since v{previous_version}\n"
             else:
-                lines.append("## Changes\n")
-            lines.append("")
+                yield "## Changes\n"
+            yield ""
         else:
-            lines.append("## Release Notes\n")
+            yield "## Release Notes\n"
 
         # No notes message
         if not grouped_notes:
-            lines.append("No changes in this release.\n")
-            return "\n".join(lines)
-
-        # Three sections, matching CHANGELOG/v0.1.0.md. Anything that is neither
-        # a new capability nor a fix to a released one is Other, breaking
-        # changes included.
-        category_order = [
-            "Features",
-            "Bug Fixes",
-            "Other",
-        ]
+            yield "No changes in this release.\n"
+            return
 
-        for category in category_order:
-            if category not in grouped_notes:
-                continue
-
-            # Breaking changes lead their section: they are the only entries a
-            # reader has to act on, and burying one mid-list is how an upgrade
-            # breaks in the field. Newest first below that.
-            notes = sorted(
-                grouped_notes[category],
-                key=lambda n: (not n["note"].lower().startswith("breaking:"), -n["seq"]),
-            )
-            lines.append(f"### {category}\n")
+        for category, notes in self.render_order(grouped_notes):
+            yield f"### {category}\n"
 
             for note in notes:
                 line = f"- {note['note']}"
                 links = [
-                    f"[#{pr['number']}]({pr['url']})"
-                    for pr in sorted(note["prs"], key=lambda p: p["number"])
+                    f"[{pr.get('repo', '')}#{pr['number']}]({pr['url']})"
+                    for pr in sorted(note["prs"], key=lambda p: (p.get("repo", ""), p["number"]))
                     if pr["url"]
                 ]
                 if links:
                     line += f" ({', '.join(links)})"
-                lines.append(line)
+                yield line
+
+            yield ""
+
+
+# ── output ───────────────────────────────────────────────────────────────────
+#
+# A sink takes one release at a time and writes it as it is rendered, so a
+# whole history streams out in one pass and a reader of the file can start
+# before the last release is done. `release` takes the render keywords of
+# `generate_markdown` plus `tag`, the release's name where there are several.
 
-            lines.append("")
 
-        return "\n".join(lines)
+class MarkdownSink:
+    """Each release's changelog, one after another."""
 
-    def generate_json(self, grouped_notes: Dict[str, List[Dict]]) -> str:
-        """Generate JSON output."""
-        return json.dumps(grouped_notes, indent=2)
+    def __init__(self, f, notes: ReleaseNotes):
+        self.f = f
+        self.notes = notes
+        self.count = 0
+
+    def release(self, grouped: Dict[str, List[Dict]], tag: Optional[str] = None, **render) -> None:
+        if self.count:
+            self.f.write("\n")
+        first = True
+        for line in self.notes.markdown_lines(grouped, **render):
+            self.f.write(line if first else "\n" + line)
+            first = False
+        self.f.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        pass
+
+
+class JsonSink:
+    """One JSON document: the grouped notes, category to entries, for a single
+    release, an object of them keyed by tag for several. Written an entry per
+    line.
+    """
+
+    def __init__(self, f, keyed: bool = False):
+        self.f = f
+        self.keyed = keyed
+        self.count = 0
+        if keyed:
+            f.write("{")
+
+    def release(self, grouped: Dict[str, List[Dict]], tag: Optional[str] = None, **render) -> None:
+        pad = "  " if self.keyed else ""
+        if self.keyed:
+            self.f.write(("," if self.count else "") + f"\n  {json.dumps(tag)}: ")
+        self.f.write("{")
+        for i, (category, entries) in enumerate(grouped.items()):
+            self.f.write(("," if i else "") + f"\n{pad}  {json.dumps(category)}: [")
+            for j, entry in enumerate(entries):
+                self.f.write(("," if j else "") + f"\n{pad}    " + json.dumps(entry, ensure_ascii=False))
+            self.f.write(f"\n{pad}  ]" if entries else "]")
+        self.f.write(f"\n{pad}}}" if grouped else "}")
+        self.f.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        if self.keyed:
+            self.f.write("\n}" if self.count else "}")
+        self.f.write("\n")
+
+
+class JsonlSink:
+    """One changelog entry per line, in render order, tagged with its release
+    and category — for `jq`, a database load, or a tool that reads as it goes.
+    """
+
+    def __init__(self, f, notes: ReleaseNotes):
+        self.f = f
+        self.notes = notes
+
+    def release(self, grouped: Dict[str, List[Dict]], tag: Optional[str] = None, **render) -> None:
+        version = render.get("version")
+        for category, entries in self.notes.render_order(grouped):
+            for entry in entries:
+                line = {"release": tag or (f"v{version}" if version else None), **entry}
+                self.f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def close(self) -> None:
+        pass
+
+
+# ── serve ────────────────────────────────────────────────────────────────────
+#
+# `validate` as a long-running process: webhook deliveries arrive over HTTP,
+# and the label lands while the author is still looking at the PR, rather than
+# after an Actions job has checked out and started.
+
+# Actions that can change what a PR's release note says.
+SERVE_ACTIONS = {"opened", "reopened", "edited", "synchronize"}
+
+# GitHub doesn't deliver a webhook payload larger than this, so a bigger body
+# isn't GitHub's; it is refused before a byte is read or hashed.
+SERVE_MAX_BODY = 25 * 1024 * 1024
+
+
+class ValidationQueue:
+    """PRs waiting to be validated, each held `debounce` seconds past its last
+    event, then run on a pool of `workers` threads.
+
+    A burst of events for one PR — a description saved five times in a minute,
+    a push that fires `synchronize` and an edit together — is one validation of
+    the latest payload. A PR is never validated twice at once: an event for
+    one already running waits until it is done. At most `limit` PRs wait;
+    `submit` refuses beyond that rather than queueing without bound.
+    """
+
+    def __init__(self, notes: ReleaseNotes, workers: int = 4, debounce: float = 0.5, limit: int = 256):
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.notes = notes
+        self.debounce = debounce
+        self.limit = limit
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.cond = threading.Condition()
+        # number -> (event, received at, due at); the newest event wins.
+        self.pending: Dict[int, Tuple[Dict, float, float]] = {}
+        self.running: set = set()
+        self.latencies = deque(maxlen=1000)
+        self.counts = {
+            "received": 0, "coalesced": 0, "processed": 0, "failed": 0, "dropped": 0, "rejected": 0,
+        }
+        self.closed = False
+        self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, number: int, event: Dict) -> bool:
+        """Queue `event` for PR `number`; False when the queue is full."""
+        now = time.monotonic()
+        with self.cond:
+            self.counts["received"] += 1
+            if number in self.pending:
+                self.counts["coalesced"] += 1
+            elif len(self.pending) >= self.limit:
+                self.counts["dropped"] += 1
+                return False
+            self.pending[number] = (event, now, now + self.debounce)
+            self.cond.notify()
+        return True
+
+    def _dispatch(self) -> None:
+        with self.cond:
+            while not self.closed:
+                now = time.monotonic()
+                due = [n for n, (_, _, at) in self.pending.items() if at <= now and n not in self.running]
+                for number in due:
+                    event, received, _ = self.pending.pop(number)
+                    self.running.add(number)
+                    self.pool.submit(self._run, number, event, received)
+                waits = [at - now for n, (_, _, at) in self.pending.items() if n not in self.running]
+                self.cond.wait(max(min(waits), 0) if waits else None)
+
+    def _run(self, number: int, event: Dict, received: float) -> None:
+        try:
+            self.notes.validate_pr(number, event=event)
+            outcome = "processed"
+        except Exception as e:
+            # A worker that dies takes nothing down with it; the next event
+            # for the PR tries again.
+            print(f"Error: PR #{number}: {e}")
+            outcome = "failed"
+        with self.cond:
+            self.running.discard(number)
+            self.counts[outcome] += 1
+            self.latencies.append(time.monotonic() - received)
+            self.cond.notify()
+
+    def stats(self) -> Dict:
+        """Queue depth, totals, and the latency from the last event for a PR
+        to its labels being written, over the last 1000 validations.
+        """
+        with self.cond:
+            latencies = sorted(self.latencies)
+            stats = dict(self.counts, pending=len(self.pending), running=len(self.running))
+        if latencies:
+            pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1)
+            stats["latency_ms"] = {"p50": pick(0.5), "p95": pick(0.95), "max": pick(1.0)}
+        stats["ratelimit_remaining"] = self.notes.http.remaining
+        return stats
+
+    def close(self) -> None:
+        """Stop dispatching, and wait for the validations already running."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.dispatcher.join()
+        self.pool.shutdown(wait=True)
+
+
+def signature_valid(secret: bytes, body: bytes, header: Optional[str]) -> bool:
+    """Whether `X-Hub-Signature-256` is the HMAC-SHA256 of `body` under `secret`."""
+    import hmac
+
+    if not header or not header.startswith("sha256="):
+        return False
+    expected = hmac.new(secret, body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, header[len("sha256="):])
+
+
+def webhook_server(host: str, port: int, secret: bytes, repo: str, queue: ValidationQueue):
+    """An HTTP server taking `pull_request` deliveries on POST and serving
+    `queue.stats()` on GET /stats.
+
+    Every delivery must carry a valid signature. `pull_request` events for
+    `repo` that can change the note are queued and answered 202 at once; the
+    rest are acknowledged and dropped. A full queue answers 503.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status: int, payload: Dict) -> None:
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.split("?")[0] == "/stats":
+                self.reply(200, queue.stats())
+            else:
+                self.reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length", ""))
+            except ValueError:
+                length = -1
+            if length < 0 or length > SERVE_MAX_BODY:
+                # The body stays unread, so the connection can't carry another request.
+                self.close_connection = True
+                if length < 0:
+                    self.reply(411, {"error": "Content-Length required"})
+                else:
+                    self.reply(413, {"error": f"body over {SERVE_MAX_BODY} bytes"})
+                return
+            body = self.rfile.read(length)
+            if not signature_valid(secret, body, self.headers.get("X-Hub-Signature-256")):
+                with queue.cond:
+                    queue.counts["rejected"] += 1
+                self.reply(401, {"error": "bad signature"})
+                return
+            kind = self.headers.get("X-GitHub-Event")
+            try:
+                event = json.loads(body)
+            except ValueError:
+                self.reply(400, {"error": "body is not JSON"})
+                return
+            pr = event.get("pull_request") or {}
+            if kind != "pull_request" or event.get("action") not in SERVE_ACTIONS or not pr.get("number"):
+                self.reply(202, {"ignored": kind})
+                return
+            if (event.get("repository") or {}).get("full_name") not in (None, repo):
+                self.reply(202, {"ignored": "another repository"})
+                return
+            if not queue.submit(pr["number"], event):
+                self.reply(503, {"error": "queue full"})
+                return
+            self.reply(202, {"queued": pr["number"]})
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def open_cache(args) -> Optional[PRCache]:
+    # A cassette holds the requests of one run; cached rows would change which
+    # requests a rerun makes.
+    if args.no_cache or args.record or args.replay:
+        return None
+    return PRCache(args.cache, refresh=args.refresh)
+
+
+def open_notes(args) -> "ReleaseNotes":
+    """A ReleaseNotes for the command line's repo, cache and transport."""
+    transport = None
+    if args.record:
+        transport = RecordingTransport(args.record)
+    elif args.replay:
+        transport = ReplayTransport(args.replay)
+    notes = ReleaseNotes(
+        args.repo, cache=open_cache(args), transport=transport, tracer=args.tracer,
+        rules_path=getattr(args, "rules", None) or DEFAULT_RULES,
+    )
+    if args.record:
+        transport.begin(notes.route)
+    notes.explain = getattr(args, "explain", False)
+    if getattr(args, "record_note", False) or not getattr(args, "no_git_notes", True):
+        notes.git_notes = GitNotes()
+    if getattr(args, "suggest_keys", False):
+        notes.similar = open_index(args, notes)
+    return notes
+
+
+def open_index(args, notes: ReleaseNotes) -> NoteIndex:
+    """The notes `--suggest-keys` compares against before the run adds its own:
+    past releases' from `--suggest-from`, and for `validate` those merged since
+    the last release, from the notes on their merge commits.
+    """
+    index = NoteIndex()
+    if args.suggest_from:
+        for release, text in changelog_notes(args.suggest_from):
+            index.add(text, release, past=True)
+    if args.command == "validate":
+        for record in notes.unreleased_records():
+            for parsed in record.notes:
+                if parsed.text.upper() != "NONE":
+                    index.add(parsed.text, f"#{record.number}", parsed.key)
+    return index
 
 
 def cmd_validate(args) -> int:
-    checker = ReleaseNotes(args.repo)
+    checker = open_notes(args)
+    if args.all_open:
+        try:
+            changes = checker.sweep(args.since, dry_run=args.dry_run)
+        except RequestError as e:
+            print(f"Error: cannot sweep open PRs: {e}")
+            return 1
+        verb = "would change" if args.dry_run else "changed"
+        print(f"{len(changes)} open PRs' labels {verb}")
+        return 0
+
     try:
-        ok = checker.validate_pr(args.pr, apply_labels=not args.no_labels)
-    except requests.RequestException as e:
+        ok = checker.validate_pr(
+            args.pr, apply_labels=not args.no_labels, event=read_event(args.event),
+            record_note=args.record_note,
+        )
+    except RequestError as e:
         print(f"Error: cannot read PR #{args.pr}: {e}")
         return 1
+    except ReleaseNotesError as e:
+        print(f"Error: {e}")
+        return 1
+    except subprocess.CalledProcessError as e:
+        print(f"Error: cannot write the note: {(e.stderr or '').strip() or e}")
+        return 1
     return 0 if ok else 1
 
 
+def open_sinks(args, notes: ReleaseNotes, stack: ExitStack, keyed: bool = False, stdout: bool = True) -> List:
+    """The sinks the command line asks for, their files registered on `stack`.
+
+    With `stdout`, `--output`'s formats go there when no file was named.
+    """
+    def sink_file(path: str, mode: str = "w"):
+        f = stack.enter_context(open(path, mode))
+        stack.callback(print, f"Output written to {path}")
+        return f
+
+    sinks = []
+    if args.file:
+        if args.output == "markdown":
+            sinks.append(MarkdownSink(sink_file(args.file), notes))
+        else:
+            sinks.append(JsonSink(sink_file(args.file), keyed))
+    if args.markdown_file:
+        sinks.append(MarkdownSink(sink_file(args.markdown_file), notes))
+    if args.json_file:
+        sinks.append(JsonSink(sink_file(args.json_file), keyed))
+    if args.jsonl_file:
+        sinks.append(JsonlSink(sink_file(args.jsonl_file), notes))
+    if stdout and not sinks and not args.step_summary:
+        if args.output in ["markdown", "both"]:
+            sinks.append(MarkdownSink(sys.stdout, notes))
+        if args.output in ["json", "both"]:
+            sinks.append(JsonSink(sys.stdout, keyed))
+    # Actions renders whatever a step appends here on the run's page.
+    summary = os.getenv("GITHUB_STEP_SUMMARY")
+    if args.step_summary and summary:
+        sinks.append(MarkdownSink(stack.enter_context(open(summary, "a")), notes))
+    for sink in sinks:
+        stack.callback(sink.close)
+    return sinks
+
+
+def release_tags(args) -> List[str]:
+    if args.tags:
+        return [tag.strip() for tag in args.tags.split(",") if tag.strip()]
+    return subprocess.run(
+        ["git", "tag", "--list", "v*", "--sort=version:refname"],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+
+
+def cmd_aggregate_releases(args) -> int:
+    try:
+        tags = release_tags(args)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Error: cannot list tags: {e}")
+        return 1
+    if not tags:
+        print("Error: no release tags to aggregate")
+        return 1
+
+    aggregator = open_notes(args)
+    try:
+        releases = aggregator.aggregate_releases(tags, args.from_flag or args.from_ref)
+        dates = aggregator.tag_dates(tags)
+    except (ReleaseNotesError, RequestError, subprocess.CalledProcessError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    os.makedirs(args.dir, exist_ok=True)
+    previous = None
+    with aggregator.tracer.span("release_notes.render", releases=len(releases)), ExitStack() as stack:
+        history = open_sinks(args, aggregator, stack, keyed=True, stdout=False)
+        for tag, grouped in releases.items():
+            version = tag[1:] if tag.startswith("v") else tag
+            render = dict(version=version, date=dates.get(tag), previous_version=previous, repo=args.repo)
+            # Each release's own file, as the release workflow writes it.
+            with ExitStack() as per_tag:
+                sinks = []
+                if args.output in ["markdown", "both"]:
+                    path = os.path.join(args.dir, f"{tag}.md")
+                    sinks.append(MarkdownSink(per_tag.enter_context(open(path, "w")), aggregator))
+                    per_tag.callback(print, f"Output written to {path}")
+                if args.output in ["json", "both"]:
+                    path = os.path.join(args.dir, f"{tag}.json")
+                    sinks.append(JsonSink(per_tag.enter_context(open(path, "w"))))
+                    per_tag.callback(print, f"Output written to {path}")
+                for sink in sinks + history:
+                    sink.release(grouped, tag=tag, **render)
+                for sink in sinks:
+                    sink.close()
+            previous = version
+
+    return 0
+
+
+def jsonl_releases(path: str) -> Dict[str, List[Dict]]:
+    """The entries of an `aggregate --jsonl-file` file, by release."""
+    releases: Dict[str, List[Dict]] = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                releases.setdefault(entry.pop("release") or "Unreleased", []).append(entry)
+    return releases
+
+
+def cmd_index(args) -> int:
+    if not (args.changelog_dir or args.jsonl or args.write_changelog
+            or args.search or args.breaking or args.pr is not None):
+        print("Error: nothing to do; give --changelog-dir or --jsonl to index, or a query")
+        return 1
+
+    try:
+        index = ReleaseIndex(args.db)
+        sources = []
+        if args.changelog_dir:
+            for name in sorted(os.listdir(args.changelog_dir)):
+                if name.endswith(".md"):
+                    path = os.path.join(args.changelog_dir, name)
+                    sources.append((name[:-3], list(changelog_entries(path)), path))
+        for path in args.jsonl or []:
+            sources.extend((release, entries, path) for release, entries in jsonl_releases(path).items())
+        changed = sum(index.load(release, entries, source) for release, entries, source in sources)
+        if sources:
+            print(f"Indexed {len(sources)} releases into {args.db}: {changed} changed")
+
+        if args.write_changelog:
+            listed = write_changelog_index(
+                args.write_changelog, index.releases(), args.changelog_dir or "CHANGELOG"
+            )
+            print(f"Listed {listed} releases in {args.write_changelog}")
+    except (OSError, ValueError, ReleaseNotesError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    if not (args.search or args.breaking or args.pr is not None):
+        return 0
+    start = time.perf_counter()
+    found = index.search(args.search, breaking=args.breaking, pr=args.pr, since=args.since)
+    elapsed = (time.perf_counter() - start) * 1000
+    for entry in found:
+        if args.json:
+            print(json.dumps(entry, ensure_ascii=False))
+            continue
+        prs = ", ".join(f"{pr.get('repo', '')}#{pr['number']}" for pr in entry["prs"])
+        print(f"{entry['release']:<10} {entry['category'] or '':<10} {prs:<12} {entry['note']}")
+    if not args.json:
+        print(f"{len(found)} entries ({elapsed:.1f} ms)")
+    return 0
+
+
+def cmd_serve(args) -> int:
+    secret = args.secret or os.getenv("GITHUB_WEBHOOK_SECRET")
+    if not secret:
+        # Unsigned deliveries would let anyone relabel PRs with our token.
+        print("Error: a webhook secret is required (--secret or $GITHUB_WEBHOOK_SECRET)")
+        return 1
+    # Each validation prints its outcome; a log collector should see it then.
+    sys.stdout.reconfigure(line_buffering=True)
+    notes = ReleaseNotes(args.repo, tracer=Tracer("serve", keep_spans=False))
+    queue = ValidationQueue(notes, workers=args.workers, debounce=args.debounce, limit=args.queue)
+    try:
+        server = webhook_server(args.host, args.port, secret.encode(), args.repo, queue)
+    except OSError as e:
+        print(f"Error: cannot listen on {args.host}:{args.port}: {e}")
+        queue.close()
+        return 1
+    host, port = server.server_address[:2]
+    print(f"Listening on http://{host}:{port}/ for {args.repo} (stats at /stats)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        queue.close()
+    return 0
+
+
 def cmd_aggregate(args) -> int:
+    if args.file and args.output == "both":
+        # One file holding Markdown then JSON is neither.
+        print("Error: --file takes one format; use --markdown-file and --json-file for both")
+        return 1
+    if (args.all_tags or args.tags) and args.range:
+        print("Error: --range renders one release; it does not combine with --all-tags or --tags")
+        return 1
+    if args.all_tags or args.tags:
+        return cmd_aggregate_releases(args)
+
     from_ref = args.from_flag or args.from_ref
     to_ref = args.to_flag or args.to_ref
-    if not from_ref or not to_ref:
+    if args.range and (from_ref or to_ref):
+        print("Error: --range gives each repository's refs; drop --from/--to")
+        return 1
+    if not args.range and (not from_ref or not to_ref):
         print("Error: both --from and --to are required")
         return 1
 
     binaries = []
     for binary_str in args.binaries or []:
         parts = binary_str.split(":")
-        if len(parts) == 3:
-            binaries.append({"filename": parts[0], "sha512": parts[1], "size": parts[2]})
-
-    aggregator = ReleaseNotes(args.repo)
-    grouped = aggregator.aggregate(from_ref, to_ref)
-
-    markdown = aggregator.generate_markdown(
-        grouped, args.version, args.date, binaries, args.previous_version, args.repo
-    )
+        if len(parts) != 3 or not all(parts):
+            # A row silently missing from the Downloads table reads as a
+            # release that never shipped that target.
+            print(f"Error: --binaries entry {binary_str!r} is not filename:sha512:size")
+            return 1
+        binaries.append({"filename": parts[0], "sha512": parts[1], "size": parts[2]})
+    if args.artifacts_dir:
+        try:
+            binaries = artifact_digests(args.artifacts_dir, args.artifacts_glob)
+        except OSError as e:
+            print(f"Error: cannot hash artifacts: {e}")
+            return 1
+        if not binaries:
+            print(f"Error: no artifacts matching {args.artifacts_glob!r} in {args.artifacts_dir}")
+            return 1
+
+    aggregator = open_notes(args)
+    try:
+        if args.range:
+            grouped = aggregator.aggregate_ranges(args.range, lambda: open_cache(args))
+        else:
+            grouped = aggregator.aggregate(from_ref, to_ref)
+    except (ReleaseNotesError, RequestError) as e:
+        print(f"Error: {e}")
+        return 1
 
-    if args.file:
-        with open(args.file, "w") as f:
-            if args.output in ["markdown", "both"]:
-                f.write(markdown)
-            if args.output in ["json", "both"]:
-                f.write(aggregator.generate_json(grouped))
-        print(f"Output written to {args.file}")
-    else:
-        if args.output in ["markdown", "both"]:
-            print(markdown)
-        if args.output in ["json", "both"]:
-            print(aggregator.generate_json(grouped))
+    with aggregator.tracer.span("release_notes.render", format=args.output), ExitStack() as stack:
+        for sink in open_sinks(args, aggregator, stack):
+            sink.release(
+                grouped, version=args.version, date=args.date, binaries=binaries,
+                previous_version=args.previous_version, repo=args.repo,
+            )
 
     return 0
 
@@ -527,12 +3373,54 @@ def main() -> int:
     parser.add_argument("--repo", default="murmur-nexus/murmur", help="GitHub repo (owner/name)")
     sub = parser.add_subparsers(dest="command", required=True)
 
-    v = sub.add_parser("validate", help="Check and label one PR's release note")
-    v.add_argument("--pr", type=int, required=True, help="PR number")
+    # Every subcommand reading PRs takes the cache and transport options.
+    cached = argparse.ArgumentParser(add_help=False)
+    cached.add_argument(
+        "--cache", default=default_cache_path(), help="PR cache file (default: %(default)s)"
+    )
+    cached.add_argument("--no-cache", action="store_true", help="Neither read nor write the PR cache")
+    cached.add_argument(
+        "--refresh", action="store_true", help="Fetch every PR afresh, then rewrite the cache"
+    )
+    cached.add_argument("--metrics", metavar="FILE", help="Write phase timings, request totals and counters as JSON")
+    cached.add_argument("--trace", metavar="FILE", help="Write the run's spans as an OTLP/JSON traces payload")
+    cassette = cached.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record", metavar="CASSETTE", help="Save every API exchange to this JSON Lines file"
+    )
+    cassette.add_argument(
+        "--replay", metavar="CASSETTE", help="Answer API requests from a recorded cassette, offline"
+    )
+
+    # Near-duplicate detection, for both subcommands.
+    similar = argparse.ArgumentParser(add_help=False)
+    similar.add_argument(
+        "--suggest-keys", action="store_true", help="Report near-duplicate notes and a key to group them"
+    )
+    similar.add_argument(
+        "--suggest-from", metavar="DIR", help="With --suggest-keys: also compare with DIR/*.md changelogs"
+    )
+
+    v = sub.add_parser("validate", parents=[cached, similar], help="Check and label one PR's release note")
+    target = v.add_mutually_exclusive_group(required=True)
+    target.add_argument("--pr", type=int, help="PR number")
+    target.add_argument(
+        "--all-open", action="store_true", help="Re-validate every open PR, relabelling only changes"
+    )
+    v.add_argument("--since", help="With --all-open: only PRs updated on or after this date (YYYY-MM-DD)")
+    v.add_argument("--dry-run", action="store_true", help="With --all-open: report changes, write nothing")
     v.add_argument("--no-labels", action="store_true", help="Report only; don't label or comment")
+    v.add_argument(
+        "--record-note", action="store_true",
+        help=f"With --pr, once merged: note the parsed notes on the merge commit under {NOTES_REF} and push",
+    )
+    v.add_argument(
+        "--event", default=os.getenv("GITHUB_EVENT_PATH"),
+        help="pull_request event payload to read the PR from (default: $GITHUB_EVENT_PATH)",
+    )
     v.set_defaults(func=cmd_validate)
 
-    a = sub.add_parser("aggregate", help="Render the changelog for a release range")
+    a = sub.add_parser("aggregate", parents=[cached, similar], help="Render the changelog for a release range")
     a.add_argument("from_ref", nargs="?", help="Starting ref (tag or commit)")
     a.add_argument("to_ref", nargs="?", help="Ending ref (tag or commit)")
     a.add_argument("--from", dest="from_flag", help="Starting ref (alternative to positional)")
@@ -542,15 +3430,98 @@ def main() -> int:
     a.add_argument(
         "--output", choices=["markdown", "json", "both"], default="markdown", help="Output format"
     )
-    a.add_argument("--file", help="Write to file instead of stdout")
-    a.add_argument("--binaries", nargs="+", help="Binary files (format: filename:sha512:size)")
+    a.add_argument("--file", help="Write --output's format to this file instead of stdout")
+    a.add_argument("--markdown-file", help="Write the Markdown changelog to this file")
+    a.add_argument("--json-file", help="Write the changelog as one JSON document to this file")
+    a.add_argument("--jsonl-file", help="Write the changelog as JSON Lines, one entry per line")
+    a.add_argument(
+        "--step-summary", action="store_true",
+        help="Append the Markdown changelog to $GITHUB_STEP_SUMMARY",
+    )
+    artifacts = a.add_mutually_exclusive_group()
+    artifacts.add_argument("--binaries", nargs="+", help="Binary files (format: filename:sha512:size)")
+    artifacts.add_argument(
+        "--artifacts-dir", metavar="DIR", help="Hash the release binaries in DIR for the Downloads table"
+    )
+    a.add_argument(
+        "--artifacts-glob", default="*", metavar="PATTERN",
+        help="With --artifacts-dir: only files matching PATTERN (default: all)",
+    )
     a.add_argument("--previous-version", help="Previous version for 'Changes since' header")
+    a.add_argument(
+        "--rules", default=DEFAULT_RULES, help="Category rules file (default: %(default)s)"
+    )
+    a.add_argument("--explain", action="store_true", help="Print the rule that filed each note")
+    a.add_argument(
+        "--no-git-notes", action="store_true",
+        help=f"Read every PR from the API, ignoring notes under {NOTES_REF}",
+    )
+    batch = a.add_mutually_exclusive_group()
+    batch.add_argument(
+        "--all-tags", action="store_true",
+        help="Render every v* tag's release in one pass; --from bounds the first",
+    )
+    batch.add_argument("--tags", help="Render these releases in one pass (comma-separated, oldest first)")
+    a.add_argument(
+        "--range", type=RepoRange.parse, action="append", metavar="OWNER/NAME=PATH:FROM..TO",
+        help="One repository's part of the release, walked in the clone at PATH; repeat for each "
+             "repository, and they are aggregated in parallel into one changelog",
+    )
+    a.add_argument(
+        "--dir", default="CHANGELOG",
+        help="Where --all-tags/--tags write <tag>.md (default: %(default)s)",
+    )
     a.set_defaults(func=cmd_aggregate)
 
+    srv = sub.add_parser(
+        "serve", help="Validate PRs as webhook deliveries arrive, instead of one Actions job each"
+    )
+    srv.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: %(default)s)")
+    srv.add_argument("--port", type=int, default=8787, help="Port to listen on; 0 picks one (default: %(default)s)")
+    srv.add_argument("--secret", help="Webhook secret (default: $GITHUB_WEBHOOK_SECRET)")
+    srv.add_argument(
+        "--debounce", type=float, default=0.5,
+        help="Seconds to wait after a PR's last event before validating it (default: %(default)s)",
+    )
+    srv.add_argument("--workers", type=int, default=4, help="Validations run at once (default: %(default)s)")
+    srv.add_argument("--queue", type=int, default=256, help="Most PRs waiting; beyond it, 503 (default: %(default)s)")
+    srv.set_defaults(func=cmd_serve)
+
+    idx = sub.add_parser(
+        "index", help="Index every release's entries for search; regenerate CHANGELOG.md's list"
+    )
+    idx.add_argument(
+        "--db", default=default_index_path(), help="Index database (default: %(default)s)"
+    )
+    idx.add_argument("--changelog-dir", metavar="DIR", help="Index the rendered DIR/<tag>.md changelogs")
+    idx.add_argument(
+        "--jsonl", metavar="FILE", action="append",
+        help="Index an aggregate --jsonl-file output (repeatable)",
+    )
+    idx.add_argument(
+        "--write-changelog", metavar="FILE",
+        help="Rewrite FILE's '## Releases' list from the index, linking --changelog-dir's files",
+    )
+    idx.add_argument("--search", metavar="TEXT", help="Entries whose note holds these words")
+    idx.add_argument("--breaking", action="store_true", help="Only Breaking: entries")
+    idx.add_argument("--pr", type=int, help="Entries linking this PR")
+    idx.add_argument("--since", metavar="TAG", help="Only releases newer than TAG")
+    idx.add_argument("--json", action="store_true", help="Print matches as JSON Lines")
+    idx.set_defaults(func=cmd_index)
+
     args = parser.parse_args()
+    args.tracer = Tracer(args.command)
     # --repo is declared on the parent parser, so it must precede the
     # subcommand; accept it after as well by falling back to the default.
-    return args.func(args)
+    code = args.func(args)
+
+    if getattr(args, "metrics", None):
+        with open(args.metrics, "w") as f:
+            json.dump(args.tracer.metrics(code), f, indent=2)
+    if getattr(args, "trace", None):
+        with open(args.trace, "w") as f:
+            json.dump(args.tracer.otlp(code), f)
+    return code
 
 
 if __name__ == "__main__":